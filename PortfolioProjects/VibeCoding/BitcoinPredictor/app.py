@@ -6,7 +6,10 @@ import plotly.graph_objects as go
 import plotly.express as px
 from utils.data_preprocessing import preprocess_data, calculate_technical_indicators
 from utils.visualizations import create_price_chart, create_volume_chart
-from utils.api_integration import get_live_bitcoin_metrics, update_data_with_latest_price
+from utils.api_integration import get_live_bitcoin_metrics, live_metrics_cache, update_data_with_latest_price
+
+# How often the live metrics are re-read from the shared cache
+LIVE_METRICS_POLL_SECONDS = 10
 
 # Configure page
 st.set_page_config(
@@ -39,38 +42,44 @@ with col1:
 
 with col2:
     if st.button("🔄 Refresh Price"):
-        st.rerun()
-
-live_metrics = get_live_bitcoin_metrics()
-if live_metrics:
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric(
-            "Current Price", 
-            f"${live_metrics['current_price']:,.2f}",
-            delta=f"{live_metrics['change_24h']:.2f}%" if live_metrics['change_24h'] else None
-        )
-    
-    with col2:
-        st.metric(
-            "24h Volume",
-            f"${live_metrics['volume_24h']:,.0f}"
-        )
-    
-    with col3:
-        change_value = (live_metrics['current_price'] * live_metrics['change_24h'] / 100) if live_metrics['change_24h'] else 0
-        st.metric(
-            "24h Change",
-            f"${abs(change_value):,.2f}",
-            delta=f"{live_metrics['change_24h']:.2f}%" if live_metrics['change_24h'] else None
-        )
-    
-    with col4:
-        st.metric(
-            "Last Updated",
-            live_metrics['last_updated'].split(' ')[1]
-        )
+        # Fetched in the background; the metrics below pick it up on their next poll
+        live_metrics_cache.refresh()
+
+def show_live_metrics():
+    """Live price metrics, read from the shared cache so rendering never waits on CoinGecko"""
+    live_metrics = get_live_bitcoin_metrics()
+    if live_metrics:
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric(
+                "Current Price", 
+                f"${live_metrics['current_price']:,.2f}",
+                delta=f"{live_metrics['change_24h']:.2f}%" if live_metrics['change_24h'] else None
+            )
+        
+        with col2:
+            st.metric(
+                "24h Volume",
+                f"${live_metrics['volume_24h']:,.0f}"
+            )
+        
+        with col3:
+            change_value = (live_metrics['current_price'] * live_metrics['change_24h'] / 100) if live_metrics['change_24h'] else 0
+            st.metric(
+                "24h Change",
+                f"${abs(change_value):,.2f}",
+                delta=f"{live_metrics['change_24h']:.2f}%" if live_metrics['change_24h'] else None
+            )
+        
+        with col4:
+            st.metric(
+                "Last Updated",
+                live_metrics['last_updated'].split(' ')[1]
+            )
+
+# Re-read the cache every few seconds; only the cache's own refresh touches the network
+st.fragment(run_every=LIVE_METRICS_POLL_SECONDS)(show_live_metrics)()
 
 st.markdown("---")
 
@@ -0,0 +1,52 @@
+"""Benchmark cold import time of utils.model_training against eager backend imports
+
+Each measurement runs in a fresh interpreter. Backends that are not installed
+are left out of the eager figure (and listed).
+
+Usage: python benchmarks/bench_imports.py [repeat]
+"""
+import importlib.util
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# The shared imports every page pays for anyway
+BASELINE = "import numpy, pandas, streamlit"
+
+# What utils.model_training used to import at module load
+EAGER_BACKENDS = [
+    ('sklearn', "import sklearn.linear_model, sklearn.ensemble, sklearn.preprocessing, sklearn.metrics"),
+    ('xgboost', "import xgboost"),
+    ('prophet', "import prophet"),
+    ('tensorflow', "import tensorflow.keras.models, tensorflow.keras.layers, tensorflow.keras.optimizers")
+]
+
+def import_time(statement, repeat):
+    """Best wall time in seconds of statement in a fresh interpreter"""
+    code = f"import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)"
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], cwd=APP_DIR, capture_output=True, text=True, check=True)
+        timings.append(float(output.stdout.strip().splitlines()[-1]))
+    
+    return min(timings)
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    installed = [(name, statement) for name, statement in EAGER_BACKENDS if importlib.util.find_spec(name)]
+    missing = [name for name, _ in EAGER_BACKENDS if not importlib.util.find_spec(name)]
+    
+    baseline = import_time(BASELINE, repeat)
+    lazy = import_time(f"{BASELINE}; from utils.model_training import ModelTrainer; ModelTrainer()", repeat)
+    eager = import_time("; ".join([BASELINE] + [statement for _, statement in installed]), repeat)
+    
+    print(f"{'numpy + pandas + streamlit':<44} {baseline * 1000:8.0f} ms")
+    print(f"{'+ utils.model_training, ModelTrainer()':<44} {lazy * 1000:8.0f} ms   (+{(lazy - baseline) * 1000:.0f} ms)")
+    print(f"{'+ eager backends (' + ', '.join(name for name, _ in installed) + ')':<44} {eager * 1000:8.0f} ms   (+{(eager - baseline) * 1000:.0f} ms)")
+    if missing:
+        print(f"not installed, excluded from the eager figure: {', '.join(missing)}")
+
+if __name__ == '__main__':
+    main()
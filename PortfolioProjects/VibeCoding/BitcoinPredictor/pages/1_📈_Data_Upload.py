@@ -1,9 +1,13 @@
+import os
 import streamlit as st
 import pandas as pd
 import numpy as np
-from utils.data_preprocessing import load_csv_data, preprocess_data
+from utils.data_preprocessing import load_csv_data, load_columnar_data, preprocess_new_rows
+from utils.columnar_io import columnar_format
+from utils.feature_cache import cache_key, cached_preprocess_data
+from utils.shared_cache import shared_cache, content_hash
 from utils.visualizations import create_price_chart
-from utils.api_integration import fetch_bitcoin_historical_coingecko, get_live_bitcoin_metrics, update_data_with_latest_price
+from utils.api_integration import get_bitcoin_history, get_live_bitcoin_metrics, update_data_with_latest_price
 
 st.set_page_config(page_title="Data Upload", page_icon="📈", layout="wide")
 
@@ -27,20 +31,37 @@ col1, col2 = st.columns([2, 1])
 
 with col1:
     uploaded_file = st.file_uploader(
-        "Choose a CSV file",
-        type="csv",
-        help="Upload a CSV file with columns: Date, Open, High, Low, Close, Volume"
+        "Choose a CSV, Parquet or Feather file",
+        type=["csv", "parquet", "feather", "arrow"],
+        help="Upload a file with columns: Date, Open, High, Low, Close, Volume"
+    )
+    resample_daily = st.checkbox(
+        "Resample to daily bars",
+        value=False,
+        help="Aggregate intraday (e.g. minute) CSV data to daily OHLCV bars while loading"
     )
     
     if uploaded_file is not None:
-        # Load the uploaded data
-        data = load_csv_data(uploaded_file)
+        # Load the uploaded data, once per server for identical files
+        file_format = columnar_format(uploaded_file.name)
+        
+        # Hashed once per upload, not on every rerun; the digest still matches identical files across sessions
+        upload_hash = st.session_state.get('upload_hash')
+        if upload_hash is None or upload_hash[0] != (uploaded_file.file_id, uploaded_file.size):
+            upload_hash = ((uploaded_file.file_id, uploaded_file.size), content_hash(uploaded_file.getvalue()))
+            st.session_state.upload_hash = upload_hash
+        
+        data_key = ('raw', upload_hash[1], file_format, resample_daily)
+        if file_format is not None:
+            data = shared_cache.get_or_create(data_key, lambda: load_columnar_data(uploaded_file, file_format))
+        else:
+            data = shared_cache.get_or_create(data_key, lambda: load_csv_data(uploaded_file, resample_daily=resample_daily))
         
         if data is not None:
             st.session_state.data = data
             st.success(f"✅ Data uploaded successfully! {len(data)} rows loaded.")
         else:
-            st.error("❌ Failed to load data. Please check your CSV format.")
+            st.error("❌ Failed to load data. Please check your file format.")
 
 with col2:
     st.markdown("### Required CSV Format")
@@ -62,7 +83,10 @@ if st.session_state.data is None:
         if st.button("Load Sample Bitcoin Data", use_container_width=True):
             # Load actual Bitcoin data from the provided CSV
             try:
-                sample_data = load_csv_data("attached_assets/bitcoin_1760372614411.csv")
+                sample_path = "attached_assets/bitcoin_1760372614411.csv"
+                sample_data = shared_cache.get_or_create(
+                    ('raw', sample_path, os.path.getmtime(sample_path)), lambda: load_csv_data(sample_path)
+                )
                 if sample_data is not None:
                     st.session_state.data = sample_data
                     st.success("✅ Sample Bitcoin data loaded successfully!")
@@ -81,7 +105,7 @@ if st.session_state.data is None:
         if st.button("Fetch Bitcoin Data from CoinGecko", use_container_width=True):
             with st.spinner(f"Fetching {days_to_fetch} days of Bitcoin data..."):
                 try:
-                    api_data = fetch_bitcoin_historical_coingecko(days=days_to_fetch)
+                    api_data = get_bitcoin_history(days=days_to_fetch)
                     if api_data is not None and len(api_data) > 0:
                         st.session_state.data = api_data
                         # Show date range clearly
@@ -135,6 +159,74 @@ if st.session_state.data is not None:
         st.markdown("**Last 20 rows (newest data):**")
         st.dataframe(st.session_state.data.tail(20), use_container_width=True)
     
+    # Append days published since the data was loaded
+    trainer = st.session_state.get('model_trainer')
+    update_models = False
+    if trainer is not None and getattr(trainer, 'update_state', None):
+        update_models = st.checkbox(
+            "🧠 Update trained models with the new days", value=True,
+            help="Fold the new days into the trained models incrementally instead of retraining them"
+        )
+    
+    if st.button("🔄 Update with Latest Price"):
+        with st.spinner("Fetching latest Bitcoin prices..."):
+            updated_data = update_data_with_latest_price(st.session_state.data)
+            new_rows = len(updated_data) - len(st.session_state.data)
+            
+            if new_rows > 0:
+                # Only the new rows need technical indicators
+                if st.session_state.processed_data is not None:
+                    st.session_state.processed_data = preprocess_new_rows(
+                        st.session_state.processed_data, updated_data
+                    )
+                st.session_state.data = updated_data
+                st.success(f"✅ Added {new_rows} new day(s) of data!")
+                
+                if update_models and st.session_state.processed_data is not None:
+                    from utils.data_preprocessing import create_features_target
+                    
+                    # Messages survive the rerun below
+                    st.session_state.model_update_messages = []
+                    targets = {}
+                    for model_name, state in list(trainer.update_state.items()):
+                        # Each model's target is rebuilt for the horizon it was trained on
+                        horizon = state.get('horizon', 1)
+                        if horizon not in targets:
+                            targets[horizon] = create_features_target(
+                                st.session_state.processed_data, 
+                                target_column='Close', 
+                                forecast_days=horizon,
+                                feature_columns=trainer.feature_names or None
+                            )
+                        X, y, _ = targets[horizon]
+                        
+                        result = trainer.update_model(model_name, X, y, df=st.session_state.processed_data, horizon=horizon)
+                        if result is None:
+                            continue
+                        if 'skipped' in result or 'error' in result:
+                            reason = result.get('skipped') or result['error']
+                            st.session_state.model_update_messages.append(('warning', f"⚠️ {model_name} not updated: {reason}"))
+                            continue
+                        
+                        message = f"🧠 {model_name} updated with {result['new_rows']} new row(s)"
+                        if result['new_mae'] is not None:
+                            message += f" (MAE on them before the update: ${result['new_mae']:,.2f})"
+                        st.session_state.model_update_messages.append(('success', message))
+                        
+                        # The test set would now score rows the updated model was fitted on
+                        if result['held_out_fitted'] and 'test_data' in st.session_state:
+                            del st.session_state['test_data']
+                            st.session_state.model_update_messages.append((
+                                'info', "ℹ️ Test set evaluation cleared: the updated models were fitted on held-out rows. Retrain to evaluate again."
+                            ))
+                
+                st.rerun()
+            else:
+                st.info("Data is already up to date.")
+    
+    for kind, message in st.session_state.pop('model_update_messages', []):
+        getattr(st, kind)(message)
+    
     # Data processing section
     st.markdown("## ⚙️ Data Processing")
     
@@ -144,7 +236,10 @@ if st.session_state.data is not None:
     if st.button("Process Data & Calculate Technical Indicators"):
         with st.spinner("Processing data and calculating technical indicators..."):
             try:
-                processed_data = preprocess_data(st.session_state.data)
+                # Sessions processing the same data share one read-only frame
+                processed_data = shared_cache.get_or_create(
+                    ('processed', cache_key(st.session_state.data)), lambda: cached_preprocess_data(st.session_state.data)
+                )
                 st.session_state.processed_data = processed_data
                 
                 st.success("✅ Data processing completed!")
@@ -175,56 +270,18 @@ if st.session_state.data is not None:
                     
                     st.session_state.model_trainer.feature_names = feature_names
                     
-                    # Train models
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
-                    
+                    # Train models in the background; the Model Training page shows progress and results
                     models_to_train = ['Linear Regression', 'Random Forest', 'XGBoost', 'LSTM', 'Prophet']
-                    results = {}
                     
-                    for idx, model_name in enumerate(models_to_train):
-                        status_text.text(f"Training {model_name}...")
-                        
-                        try:
-                            if model_name == 'Linear Regression':
-                                metrics = st.session_state.model_trainer.train_linear_regression(
-                                    X_train, y_train, X_val, y_val
-                                )
-                            elif model_name == 'Random Forest':
-                                metrics = st.session_state.model_trainer.train_random_forest(
-                                    X_train, y_train, X_val, y_val
-                                )
-                            elif model_name == 'XGBoost':
-                                metrics = st.session_state.model_trainer.train_xgboost(
-                                    X_train, y_train, X_val, y_val
-                                )
-                            elif model_name == 'LSTM':
-                                metrics = st.session_state.model_trainer.train_lstm(
-                                    X_train, y_train, X_val, y_val
-                                )
-                                # LSTM can be skipped if insufficient data
-                                if metrics is None:
-                                    status_text.text(f"⏭️ {model_name} skipped (insufficient data)")
-                            elif model_name == 'Prophet':
-                                metrics = st.session_state.model_trainer.train_prophet(
-                                    processed_data, target_column='Close'
-                                )
-                            
-                            if metrics:
-                                results[model_name] = metrics
-                                status_text.text(f"✅ {model_name} trained successfully")
-                        
-                        except Exception as e:
-                            st.warning(f"⚠️ Could not train {model_name}: {str(e)}")
-                        
-                        progress_bar.progress((idx + 1) / len(models_to_train))
-                    
-                    status_text.text("✅ Auto-retraining completed!")
-                    st.session_state.training_results = results
-                    st.session_state.test_data = (X_test, y_test)
+                    from utils.training_jobs import submit_training_job
+                    st.session_state.training_job_id = submit_training_job(
+                        st.session_state.model_trainer, models_to_train, X_train, y_train, X_val, y_val,
+                        df=processed_data, test_data=(X_test, y_test), feature_names=feature_names,
+                        data_rows=len(X), horizon=1
+                    )
                     
-                    st.success(f"✅ Successfully retrained {len(results)} models!")
-                    st.info("Navigate to Model Training page to view detailed results.")
+                    st.success(f"✅ Retraining {len(models_to_train)} models in the background!")
+                    st.info("Navigate to Model Training page to follow progress and view detailed results.")
                 
                 # Show processing results
                 st.markdown("### Processing Results")
@@ -5,6 +5,7 @@ from utils.visualizations import (
     create_price_chart, create_volume_chart, create_technical_indicators_chart,
     create_correlation_heatmap
 )
+from utils.columnar_io import write_columnar
 
 st.set_page_config(page_title="Data Visualization", page_icon="📊", layout="wide")
 
@@ -218,7 +219,7 @@ if st.session_state.processed_data is not None:
         with st.spinner("Generating correlation heatmap..."):
             try:
                 # Select a subset of features for correlation
-                feature_cols = [col for col in processed_filtered.columns if col not in ['Date'] and processed_filtered[col].dtype in ['float64', 'int64']]
+                feature_cols = [col for col in processed_filtered.columns if col not in ['Date'] and pd.api.types.is_numeric_dtype(processed_filtered[col])]
                 if len(feature_cols) > 50:
                     feature_cols = feature_cols[:50]  # Limit to first 50 features
                 
@@ -263,25 +264,35 @@ if len(filtered_data) > 1:
 # Export options
 st.markdown("### 💾 Export Options")
 
+export_format = st.radio("Format", ["CSV", "Parquet", "Feather"], horizontal=True)
+
+def export_file(df, name):
+    """File bytes, file name and MIME type of df in the chosen export format"""
+    if export_format == "CSV":
+        return df.to_csv(index=False), f"{name}.csv", "text/csv"
+    
+    file_format = export_format.lower()
+    return write_columnar(df, file_format=file_format), f"{name}.{file_format}", "application/octet-stream"
+
 col1, col2 = st.columns(2)
 
 with col1:
     if st.button("Download Filtered Data"):
-        csv = filtered_data.to_csv(index=False)
+        data, file_name, mime = export_file(filtered_data, f"bitcoin_data_{start_date}_{end_date}")
         st.download_button(
-            label="Download CSV",
-            data=csv,
-            file_name=f"bitcoin_data_{start_date}_{end_date}.csv",
-            mime="text/csv"
+            label=f"Download {export_format}",
+            data=data,
+            file_name=file_name,
+            mime=mime
         )
 
 with col2:
     if st.session_state.processed_data is not None:
         if st.button("Download Processed Data"):
-            csv = processed_filtered.to_csv(index=False)
+            data, file_name, mime = export_file(processed_filtered, f"bitcoin_processed_{start_date}_{end_date}")
             st.download_button(
-                label="Download Processed CSV",
-                data=csv,
-                file_name=f"bitcoin_processed_{start_date}_{end_date}.csv",
-                mime="text/csv"
+                label=f"Download Processed {export_format}",
+                data=data,
+                file_name=file_name,
+                mime=mime
             )
@@ -1,10 +1,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from utils.model_training import ModelTrainer
+from utils.model_training import ModelTrainer, MULTI_HORIZON_MODELS
+from utils.training_jobs import submit_training_job, get_training_job, active_training_jobs
+from utils.model_registry import training_data_hash, warm_load
 from utils.data_preprocessing import create_features_target, split_data
 from utils.visualizations import create_feature_importance_chart, create_residuals_plot
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import plotly.express as px
 import time
 
@@ -92,6 +93,17 @@ with st.spinner("Preparing features and target variable..."):
         
         st.success("✅ Data preparation completed!")
         
+        # Warm start from models saved for exactly this data, once per data set
+        data_hash = training_data_hash(X_train, y_train)
+        if st.session_state.get('registry_checked') != data_hash and not active_training_jobs():
+            st.session_state.registry_checked = data_hash
+            warm_results = warm_load(st.session_state.model_trainer, selected_models, feature_names, data_hash)
+            if warm_results:
+                saved_metrics = {model_name: metrics for model_name, metrics in warm_results.items() if metrics}
+                st.session_state.training_results = {**st.session_state.get('training_results', {}), **saved_metrics}
+                st.session_state.test_data = (X_test, y_test)
+                st.info(f"♻️ Loaded {', '.join(warm_results)} from the model registry (same features and training data).")
+        
         # Show data split information
         col1, col2, col3 = st.columns(3)
         
@@ -113,65 +125,43 @@ with st.spinner("Preparing features and target variable..."):
 st.markdown("## 🚀 Model Training")
 
 if st.button("🎯 Train Selected Models", type="primary"):
-    results = {}
-    
-    # Progress tracking
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
-    total_models = len(selected_models)
-    
-    for idx, model_name in enumerate(selected_models):
-        status_text.text(f"Training {model_name}...")
-        
-        try:
-            if model_name == 'Linear Regression':
-                metrics = st.session_state.model_trainer.train_linear_regression(
-                    X_train, y_train, X_val, y_val
-                )
-                
-            elif model_name == 'Random Forest':
-                metrics = st.session_state.model_trainer.train_random_forest(
-                    X_train, y_train, X_val, y_val
-                )
-                
-            elif model_name == 'XGBoost':
-                metrics = st.session_state.model_trainer.train_xgboost(
-                    X_train, y_train, X_val, y_val
-                )
-                
-            elif model_name == 'LSTM':
-                metrics = st.session_state.model_trainer.train_lstm(
-                    X_train, y_train, X_val, y_val
-                )
-                if metrics is None:
-                    # LSTM was skipped due to insufficient data
-                    continue
-                
-            elif model_name == 'Prophet':
-                metrics = st.session_state.model_trainer.train_prophet(
-                    st.session_state.processed_data, target_column='Close'
-                )
-            
-            if metrics:
-                results[model_name] = metrics
-                st.success(f"✅ {model_name} trained successfully!")
-            else:
-                st.error(f"❌ Failed to train {model_name}")
-                
-        except Exception as e:
-            st.error(f"❌ Error training {model_name}: {str(e)}")
-        
-        progress_bar.progress((idx + 1) / total_models)
+    # Training runs in the background, so reruns neither stop nor repeat it
+    st.session_state.training_job_id = submit_training_job(
+        st.session_state.model_trainer, selected_models, X_train, y_train, X_val, y_val,
+        df=st.session_state.processed_data, test_data=(X_test, y_test), feature_names=feature_names,
+        data_rows=len(X), horizon=forecast_days
+    )
+
+def show_training_job(job, was_running):
+    """Progress of a training job, publishing its results to the page as they arrive"""
+    if job.running:
+        st.progress(job.progress, text=f"Training {', '.join(job.model_names)}... ({len(job.completed)}/{len(job.model_names)} done)")
+    elif job.status == 'failed':
+        st.error(f"❌ Training failed after {job.finished_at - job.started_at:.1f}s: {job.errors.get('job')}")
+    else:
+        st.success(f"Training completed in {job.finished_at - job.started_at:.1f}s!")
     
-    status_text.text("Training completed!")
+    for model_name, error in job.errors.items():
+        if model_name != 'job':
+            st.error(f"❌ Error training {model_name}: {error}")
+    for model_name in job.skipped:
+        # Failures arrive as errors above; a model without metrics was skipped (LSTM, on too few rows)
+        st.warning(f"⚠️ {model_name} skipped: not enough training rows")
     
-    # Store results in session state
-    st.session_state.training_results = results
-    st.session_state.test_data = (X_test, y_test)
+    # Store results in session state and redraw the result sections with them
+    results = job.snapshot()
+    if results != st.session_state.get('training_results') or (was_running and not job.running):
+        st.session_state.training_results = results
+        st.session_state.test_data = job.test_data
+        st.rerun()
+
+job = get_training_job(st.session_state.get('training_job_id'))
+if job is not None:
+    # Only a running job is polled; the rest of the page stays interactive meanwhile
+    st.fragment(run_every=2 if job.running else None)(show_training_job)(job, job.running)
 
 # Display training results
-if hasattr(st.session_state, 'training_results'):
+if st.session_state.get('training_results'):
     st.markdown("## 📊 Training Results")
     
     # Create results dataframe
@@ -241,6 +231,8 @@ if hasattr(st.session_state, 'training_results'):
     if hasattr(st.session_state, 'test_data'):
         st.markdown("### 🎯 Test Set Evaluation")
         
+        from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+        
         X_test, y_test = st.session_state.test_data
         test_results = []
         
@@ -279,7 +271,7 @@ if hasattr(st.session_state, 'training_results'):
             st.success(f"🏆 Best performing model: **{best_model}** (lowest Test MAE)")
 
 # Model details section
-if hasattr(st.session_state, 'training_results'):
+if st.session_state.get('training_results'):
     st.markdown("### 🔍 Model Details")
     
     selected_model = st.selectbox(
@@ -321,6 +313,90 @@ if hasattr(st.session_state, 'training_results'):
                 except Exception as e:
                     st.warning(f"Could not create residuals plot: {str(e)}")
 
+# Direct multi-horizon models: every horizon from one model and one training run
+st.markdown("## 🎯 Direct Multi-Horizon Models")
+st.info("Train one multi-output model per algorithm that predicts all selected horizons at once, instead of retraining for each forecast horizon.")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    horizon_models = st.multiselect(
+        "Models",
+        options=MULTI_HORIZON_MODELS,
+        default=[model_name for model_name in MULTI_HORIZON_MODELS if model_name in selected_models]
+    )
+
+with col2:
+    horizons = st.multiselect("Horizons (days)", options=[1, 3, 7, 14, 30], default=[1, 3, 7, 14, 30])
+
+if st.button("🎯 Train Multi-Horizon Models", disabled=not (horizon_models and horizons)):
+    horizons = sorted(horizons)
+    
+    # All horizon targets in one pass
+    X_h, Y_h, horizon_features = create_features_target(
+        st.session_state.processed_data, 
+        target_column='Close', 
+        forecast_days=horizons
+    )
+    
+    if X_h is None:
+        st.error("❌ Not enough data for the longest horizon.")
+    else:
+        X_h_train, X_h_val, X_h_test, Y_h_train, Y_h_val, Y_h_test = split_data(
+            X_h, Y_h, test_size=test_size, validation_size=val_size
+        )
+        
+        # Trained in the background and saved to the model registry, like the single-horizon models
+        st.session_state.horizon_job_id = submit_training_job(
+            st.session_state.model_trainer, horizon_models, X_h_train, Y_h_train, X_h_val, Y_h_val,
+            feature_names=horizon_features, horizons=horizons
+        )
+
+def show_horizon_job(job, was_running):
+    """Progress of a multi-horizon training job, publishing its results when they change"""
+    if job.running:
+        st.progress(job.progress, text=f"Training multi-horizon {', '.join(job.model_names)}... ({len(job.completed)}/{len(job.model_names)} done)")
+    elif job.status == 'failed':
+        st.error(f"❌ Multi-horizon training failed: {job.errors.get('job')}")
+    
+    for model_name, error in job.errors.items():
+        if model_name != 'job':
+            st.error(f"❌ {error}")
+    
+    results = job.snapshot()
+    if results != st.session_state.get('horizon_results') or (was_running and not job.running):
+        st.session_state.horizon_results = results
+        st.rerun()
+
+horizon_job = get_training_job(st.session_state.get('horizon_job_id'))
+if horizon_job is not None:
+    st.fragment(run_every=2 if horizon_job.running else None)(show_horizon_job)(horizon_job, horizon_job.running)
+
+if st.session_state.get('horizon_results'):
+    horizon_data = []
+    for model_name, horizon_metrics in st.session_state.horizon_results.items():
+        for horizon, metrics in horizon_metrics.items():
+            horizon_data.append({
+                'Model': model_name,
+                'Horizon (days)': horizon,
+                'Val MAE': metrics['val_mae'],
+                'Val RMSE': metrics['val_rmse'],
+                'Val R²': metrics['val_r2']
+            })
+    
+    horizon_df = pd.DataFrame(horizon_data)
+    st.dataframe(horizon_df.round(4))
+    
+    fig_horizons = px.line(
+        horizon_df, 
+        x='Horizon (days)', 
+        y='Val MAE', 
+        color='Model', 
+        markers=True,
+        title='Validation MAE by Forecast Horizon'
+    )
+    st.plotly_chart(fig_horizons, use_container_width=True)
+
 # Model saving/loading section
 st.markdown("## 💾 Model Management")
 
@@ -336,5 +412,8 @@ with col2:
         st.session_state.model_trainer = ModelTrainer()
         if hasattr(st.session_state, 'training_results'):
             del st.session_state.training_results
+        st.session_state.pop('horizon_results', None)
+        st.session_state.pop('training_job_id', None)
+        st.session_state.pop('horizon_job_id', None)
         st.success("✅ All models cleared!")
         st.rerun()
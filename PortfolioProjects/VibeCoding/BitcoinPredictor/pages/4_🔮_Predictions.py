@@ -4,10 +4,13 @@ import numpy as np
 from datetime import datetime, timedelta
 from utils.visualizations import create_prediction_chart, create_forecast_chart
 from utils.data_preprocessing import create_features_target
+from utils.forecasting import recursive_forecast
+from utils.trading import simulate_strategy, sweep_strategies, trade_log
+from utils.backtesting import WALK_FORWARD_MODELS, walk_forward_backtest, walk_forward_folds, stitch_predictions
 from utils.pdf_generator import create_prediction_pdf, create_forecast_pdf
+from utils.shared_cache import content_hash
 import plotly.graph_objects as go
 import plotly.express as px
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
 st.set_page_config(page_title="Predictions", page_icon="🔮", layout="wide")
 
@@ -30,6 +33,9 @@ if st.session_state.processed_data is None:
     st.warning("⚠️ No processed data available. Please upload and process data first!")
     st.stop()
 
+# Only the columns the trained models were fitted on are needed for inference
+model_features = st.session_state.model_trainer.feature_names or None
+
 # Sidebar for prediction options
 st.sidebar.header("Prediction Settings")
 
@@ -64,7 +70,8 @@ if prediction_type == "Next Day Prediction":
                 X, y, feature_names = create_features_target(
                     st.session_state.processed_data, 
                     target_column='Close', 
-                    forecast_days=1
+                    forecast_days=1,
+                    feature_columns=model_features
                 )
                 
                 # Use the last available data point for prediction
@@ -385,32 +392,20 @@ elif prediction_type == "Multi-Day Forecast":
                     if forecast is not None:
                         forecasts['Prophet'] = forecast['yhat'].tail(forecast_days).values
                 
-                # Other models (simplified approach - using last known features)
-                X, y, feature_names = create_features_target(
-                    st.session_state.processed_data, 
-                    target_column='Close', 
-                    forecast_days=1
-                )
+                # Other models: recursive forecast, each predicted close rolls the features forward a day
+                feature_names = model_features or [
+                    col for col in st.session_state.processed_data.columns if col not in ['Date', 'Close']
+                ]
                 
-                if len(X) > 0:
-                    last_features = X[-1:]
-                    
-                    for model_name in selected_models:
-                        if model_name != 'Prophet':
-                            # Simple iterative prediction (not ideal for long horizons)
-                            model_forecast = []
-                            current_features = last_features.copy()
-                            
-                            for day in range(min(forecast_days, 7)):  # Limit to 7 days for non-Prophet models
-                                pred = st.session_state.model_trainer.predict(model_name, current_features)
-                                if pred is not None and len(pred) > 0:
-                                    model_forecast.append(pred[0])
-                                    # This is a simplified approach - in practice, you'd update features
-                                else:
-                                    break
-                            
-                            if len(model_forecast) > 0:
-                                forecasts[model_name] = model_forecast
+                for model_name in selected_models:
+                    if model_name != 'Prophet':
+                        model_forecast = recursive_forecast(
+                            st.session_state.model_trainer, model_name,
+                            st.session_state.processed_data, feature_names, forecast_days
+                        )
+                        
+                        if len(model_forecast) > 0:
+                            forecasts[model_name] = model_forecast
                 
                 if forecasts:
                     # Display forecast results
@@ -508,54 +503,104 @@ elif prediction_type == "Multi-Day Forecast":
                 
             except Exception as e:
                 st.error(f"Error generating forecast: {str(e)}")
+    
+    # Direct multi-horizon models predict every horizon from the latest features in one call
+    horizon_models = getattr(st.session_state.model_trainer, 'horizon_models', {})
+    if horizon_models:
+        st.markdown("### 🎯 Direct Multi-Horizon Forecast")
+        
+        trainer = st.session_state.model_trainer
+        latest_features = st.session_state.processed_data[trainer.horizon_feature_names].to_numpy()[-1:]
+        last_date = st.session_state.processed_data['Date'].iloc[-1]
+        current_price = st.session_state.processed_data['Close'].iloc[-1]
+        
+        horizon_forecast = {'Horizon (days)': trainer.horizons}
+        horizon_forecast['Date'] = [(last_date + timedelta(days=horizon)).strftime('%Y-%m-%d') for horizon in trainer.horizons]
+        for model_name in horizon_models:
+            horizon_forecast[model_name] = trainer.predict_horizons(model_name, latest_features)[0]
+        
+        horizon_forecast_df = pd.DataFrame(horizon_forecast)
+        st.dataframe(horizon_forecast_df.round(2), use_container_width=True)
+        
+        fig_direct = go.Figure()
+        for model_name in horizon_models:
+            fig_direct.add_trace(go.Scatter(
+                x=[0] + trainer.horizons,
+                y=[current_price] + list(horizon_forecast_df[model_name]),
+                mode='lines+markers',
+                name=model_name
+            ))
+        fig_direct.update_layout(
+            title='Direct Forecast by Horizon',
+            xaxis_title='Days Ahead',
+            yaxis_title='Price ($)',
+            template='plotly_white'
+        )
+        st.plotly_chart(fig_direct, use_container_width=True)
 
 elif prediction_type == "Historical Backtest":
     st.markdown("## 📈 Historical Backtest Analysis")
     
-    backtest_days = st.sidebar.slider("Backtest Period (days)", 30, 200, 60)
+    # Every model is refitted as the test walks forward, so each prediction only uses earlier data
+    max_backtest_days = max(len(st.session_state.processed_data) - 100, 30)
+    backtest_days = st.sidebar.slider("Backtest Period (days)", 30, max_backtest_days, min(365, max_backtest_days))
+    refit_every = st.sidebar.slider("Refit Every (days)", 1, 90, 30)
+    window_type = st.sidebar.radio("Training Window", ["Expanding", "Rolling"])
+    window = None
+    if window_type == "Rolling":
+        window = st.sidebar.slider("Rolling Window (days)", 60, 1000, 365)
     
     if st.button("🔄 Run Backtest", type="primary"):
-        with st.spinner("Running historical backtest..."):
+        with st.spinner("Running walk-forward backtest..."):
             try:
                 # Prepare data for backtesting
                 X, y, feature_names = create_features_target(
                     st.session_state.processed_data, 
                     target_column='Close', 
-                    forecast_days=1
+                    forecast_days=1,
+                    feature_columns=model_features
                 )
                 
-                if len(X) < backtest_days:
-                    st.warning(f"Not enough data for {backtest_days}-day backtest. Using {len(X)} days.")
-                    backtest_days = len(X)
+                if len(X) - backtest_days < 60:
+                    backtest_days = max(len(X) - 60, 1)
+                    st.warning(f"Not enough data for the requested backtest. Using {backtest_days} days.")
+                
+                start = len(X) - backtest_days
+                backtest_models = [model_name for model_name in selected_models if model_name in WALK_FORWARD_MODELS]
+                dates = st.session_state.processed_data['Date'].iloc[:len(X)]
+                closes = st.session_state.processed_data['Close'].to_numpy()[:len(X)]
+                
+                progress = st.progress(0.0, text="Walking forward...")
+                fold_results = []
+                n_jobs = len(backtest_models) * len(walk_forward_folds(len(X), start, refit_every, window))
+                for model_name, fold, predictions, error in walk_forward_backtest(backtest_models, X, y, start, refit_every, window):
+                    fold_results.append((model_name, fold, predictions, error))
+                    progress.progress(len(fold_results) / n_jobs, text=f"Walking forward... ({len(fold_results)}/{n_jobs} folds)")
+                progress.empty()
                 
-                # Use last backtest_days for backtesting
-                X_backtest = X[-backtest_days:]
-                y_backtest = y[-backtest_days:]
-                dates_backtest = st.session_state.processed_data['Date'].iloc[-(backtest_days+1):-1]
+                errors = {model_name: error for model_name, _, _, error in fold_results if error}
+                for model_name, error in errors.items():
+                    st.error(f"❌ Error backtesting {model_name}: {error}")
                 
                 backtest_results = {}
                 
-                for model_name in selected_models:
-                    if model_name != 'Prophet':  # Prophet needs different handling
-                        predictions = st.session_state.model_trainer.predict(model_name, X_backtest)
-                        
-                        if predictions is not None and len(predictions) > 0:
-                            # Handle LSTM predictions alignment
-                            if model_name == 'LSTM' and len(predictions) != len(y_backtest):
-                                y_aligned = y_backtest[-len(predictions):]
-                                dates_aligned = dates_backtest[-len(predictions):]
-                            else:
-                                y_aligned = y_backtest
-                                dates_aligned = dates_backtest
-                                
-                            if len(predictions) == len(y_aligned):
-                                backtest_results[model_name] = {
-                                    'predictions': predictions,
-                                    'actual': y_aligned,
-                                    'dates': dates_aligned
-                                }
+                for model_name, predictions in stitch_predictions(fold_results, len(X), start).items():
+                    # Folds whose model could not be trained (e.g. LSTM on a short window) are left out
+                    predicted = ~np.isnan(predictions)
+                    if predicted.any():
+                        backtest_results[model_name] = {
+                            'predictions': predictions[predicted],
+                            'actual': y[start:][predicted],
+                            'current': closes[start:][predicted],
+                            'dates': dates.iloc[start:][predicted].reset_index(drop=True)
+                        }
+                
+                # Kept for the strategy simulation, which runs on a later rerun
+                st.session_state.backtest_results = backtest_results
                 
                 if backtest_results:
+                    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+                    
                     # Display backtest results
                     st.markdown("### 📊 Backtest Performance")
                     
@@ -613,7 +658,7 @@ elif prediction_type == "Historical Backtest":
                         ))
                     
                     fig.update_layout(
-                        title=f"Historical Backtest - Last {backtest_days} Days",
+                        title=f"Walk-Forward Backtest - Last {backtest_days} Days (refit every {refit_every} days)",
                         xaxis_title="Date",
                         yaxis_title="Price (USD)",
                         height=600,
@@ -706,79 +751,131 @@ elif prediction_type == "Historical Backtest":
                 st.error(f"Error running backtest: {str(e)}")
 
 # Trading strategy simulation (bonus feature)
-st.markdown("## 💰 Simple Trading Strategy Simulation")
+st.markdown("## 💰 Trading Strategy Simulation")
 
 if st.checkbox("Run Trading Strategy Simulation"):
-    st.markdown("### 📊 Strategy: Buy when predicted price > current price")
+    st.markdown("### 📊 Strategy: Long when the predicted return beats the threshold, flat when it falls below its negative")
     
-    if hasattr(st.session_state, 'training_results'):
+    backtest_results = st.session_state.get('backtest_results')
+    if not backtest_results:
+        st.info("Run a Historical Backtest first; the strategy trades on its out-of-sample predictions.")
+    else:
         strategy_model = st.selectbox(
             "Select model for strategy",
-            options=available_models
+            options=list(backtest_results.keys())
         )
+        results = backtest_results[strategy_model]
         
-        initial_capital = st.number_input("Initial Capital ($)", value=10000, min_value=1000)
+        col1, col2, col3, col4 = st.columns(4)
         
-        if st.button("🚀 Run Strategy Simulation"):
-            try:
-                # Simple buy/hold strategy based on predictions
-                st.info("This is a simplified simulation for educational purposes only!")
-                
-                # Use backtest data if available
-                if 'backtest_results' in locals() and strategy_model in backtest_results:
-                    results = backtest_results[strategy_model]
-                    
-                    # Simple strategy: buy when predicted price > current, sell when < current
-                    capital = initial_capital
-                    position = 0  # BTC position
-                    trades = []
-                    
-                    for i in range(1, len(results['predictions'])):
-                        current_price = results['actual'][i-1]
-                        predicted_price = results['predictions'][i]
-                        actual_next_price = results['actual'][i]
-                        
-                        if predicted_price > current_price and position == 0:
-                            # Buy signal
-                            position = capital / current_price
-                            capital = 0
-                            trades.append(('BUY', current_price, results['dates'][i-1]))
-                        
-                        elif predicted_price < current_price and position > 0:
-                            # Sell signal
-                            capital = position * current_price
-                            position = 0
-                            trades.append(('SELL', current_price, results['dates'][i-1]))
-                    
-                    # Close position at end
-                    if position > 0:
-                        final_price = results['actual'][-1]
-                        capital = position * final_price
-                        position = 0
-                        trades.append(('SELL', final_price, results['dates'][-1]))
-                    
-                    # Calculate returns
-                    total_return = ((capital / initial_capital) - 1) * 100
-                    
-                    # Buy and hold comparison
-                    buy_hold_return = ((results['actual'][-1] / results['actual'][0]) - 1) * 100
-                    
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        st.metric("Strategy Return", f"{total_return:.2f}%")
-                    
-                    with col2:
-                        st.metric("Buy & Hold Return", f"{buy_hold_return:.2f}%")
-                    
-                    with col3:
-                        st.metric("Number of Trades", len(trades))
-                    
-                    # Show trades
-                    if trades:
-                        st.markdown("### 📋 Trade History")
-                        trades_df = pd.DataFrame(trades, columns=['Action', 'Price', 'Date'])
-                        st.dataframe(trades_df)
+        with col1:
+            initial_capital = st.number_input("Initial Capital ($)", value=10000, min_value=1000)
+        
+        with col2:
+            threshold = st.number_input("Signal Threshold (%)", value=0.0, min_value=0.0, max_value=20.0, step=0.1) / 100
+        
+        with col3:
+            fee = st.number_input("Fee per Trade (%)", value=0.1, min_value=0.0, max_value=5.0, step=0.05) / 100
+        
+        with col4:
+            slippage = st.number_input("Slippage (%)", value=0.05, min_value=0.0, max_value=5.0, step=0.05) / 100
+        
+        st.info("This is a simplified simulation for educational purposes only!")
+        
+        try:
+            simulation = simulate_strategy(
+                results['current'], results['predictions'], results['actual'],
+                threshold=threshold, fee=fee, slippage=slippage, initial_capital=initial_capital
+            )
+            trades = trade_log(simulation['positions'], results['current'], results['actual'], results['dates'])
+            
+            col1, col2, col3, col4, col5 = st.columns(5)
+            
+            with col1:
+                st.metric("Strategy Return", f"{simulation['total_return']:.2f}%")
+            
+            with col2:
+                st.metric("Buy & Hold Return", f"{simulation['buy_hold_return']:.2f}%")
+            
+            with col3:
+                st.metric("Sharpe Ratio", f"{simulation['sharpe']:.2f}")
+            
+            with col4:
+                st.metric("Max Drawdown", f"{simulation['max_drawdown']:.2f}%")
+            
+            with col5:
+                st.metric("Number of Trades", len(trades))
+            
+            # Equity curve against buy and hold, with the strategy's drawdown below
+            fig_equity = go.Figure()
+            fig_equity.add_trace(go.Scatter(x=results['dates'], y=simulation['equity'], name='Strategy', line=dict(color='green')))
+            fig_equity.add_trace(go.Scatter(x=results['dates'], y=simulation['buy_hold_equity'], name='Buy & Hold', line=dict(color='gray', dash='dash')))
+            fig_equity.update_layout(title="Equity Curve", xaxis_title="Date", yaxis_title="Portfolio Value (USD)", height=450)
+            st.plotly_chart(fig_equity, use_container_width=True)
+            
+            fig_drawdown = px.area(
+                x=results['dates'],
+                y=simulation['drawdown'] * 100,
+                title="Strategy Drawdown",
+                labels={'x': 'Date', 'y': 'Drawdown (%)'}
+            )
+            st.plotly_chart(fig_drawdown, use_container_width=True)
+            
+            # Show trades
+            if len(trades) > 0:
+                st.markdown("### 📋 Trade History")
+                st.dataframe(trades)
+            
+            # Parameter sweep: every threshold x fee combination, simulated in bounded batches
+            st.markdown("### 🧪 Parameter Sweep")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                max_threshold = st.slider("Threshold Range (%)", 0.5, 10.0, 3.0, 0.5)
+                n_thresholds = st.slider("Threshold Steps", 10, 200, 50)
+            
+            with col2:
+                max_fee = st.slider("Fee Range (%)", 0.05, 1.0, 0.5, 0.05)
+                n_fees = st.slider("Fee Steps", 2, 50, 10)
+            
+            # The sweep only runs on request; its result is kept for exactly these inputs
+            sweep_key = (
+                strategy_model, content_hash(np.asarray(results['predictions'], dtype=float).tobytes()),
+                max_threshold, n_thresholds, max_fee, n_fees, slippage, initial_capital
+            )
+            if st.button(f"🧪 Run Sweep ({n_thresholds * n_fees} strategies)"):
+                with st.spinner("Simulating every threshold and fee..."):
+                    sweep = sweep_strategies(
+                        results['current'], results['predictions'], results['actual'],
+                        thresholds=np.linspace(0, max_threshold / 100, n_thresholds),
+                        fees=np.linspace(0, max_fee / 100, n_fees),
+                        slippage=slippage, initial_capital=initial_capital
+                    )
+                    sweep['Threshold'] *= 100
+                    sweep['Fee'] *= 100
+                    st.session_state.strategy_sweep = (sweep_key, sweep)
+            
+            cached_key, sweep = st.session_state.get('strategy_sweep', (None, None))
+            if sweep is not None and cached_key != sweep_key:
+                st.info("The sweep settings or predictions changed; run the sweep again to update it.")
+            elif sweep is not None:
+                sweep_metric = st.radio("Sweep Metric", ['Sharpe', 'Total Return (%)', 'Max Drawdown (%)'], horizontal=True)
+                fig_sweep = px.density_heatmap(
+                    sweep,
+                    x='Threshold',
+                    y='Fee',
+                    z=sweep_metric,
+                    histfunc='avg',
+                    nbinsx=n_thresholds,
+                    nbinsy=n_fees,
+                    title=f"{sweep_metric} by Threshold (%) and Fee (%) - {len(sweep)} strategies",
+                    color_continuous_scale='RdYlGn'
+                )
+                st.plotly_chart(fig_sweep, use_container_width=True)
                 
-            except Exception as e:
-                st.error(f"Error running strategy simulation: {str(e)}")
+                st.markdown("#### Top Strategies by Sharpe")
+                st.dataframe(sweep.nlargest(10, 'Sharpe').round(4))
+            
+        except Exception as e:
+            st.error(f"Error running strategy simulation: {str(e)}")
@@ -0,0 +1,27 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+def make_ohlcv(n_rows, seed=0, start='2020-01-01'):
+    """Daily OHLCV bars following a random walk"""
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.02, n_rows)))
+    open_price = np.concatenate([[close[0]], close[:-1]])
+    
+    return pd.DataFrame({
+        'Date': pd.date_range(start, periods=n_rows, freq='D'),
+        'Open': open_price,
+        'High': np.maximum(open_price, close) * (1 + rng.uniform(0, 0.02, n_rows)),
+        'Low': np.minimum(open_price, close) * (1 - rng.uniform(0, 0.02, n_rows)),
+        'Close': close,
+        'Adj Close': close,
+        'Volume': rng.uniform(1e9, 5e9, n_rows)
+    })
+
+@pytest.fixture
+def ohlcv():
+    return make_ohlcv(400)
@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+from utils.history_store import load_history, missing_ranges, store_history, utc_today
+from conftest import make_ohlcv
+
+@pytest.fixture
+def bars():
+    # Spans a year boundary, so two yearly partitions are written
+    return make_ohlcv(60, start='2023-12-01')
+
+def test_round_trip(tmp_path, bars):
+    assert store_history(bars, history_dir=tmp_path) == len(bars)
+    
+    loaded = load_history(history_dir=tmp_path)
+    pd.testing.assert_frame_equal(loaded, bars, check_dtype=False)
+    assert sorted(path.name for path in (tmp_path / 'bitcoin').iterdir()) == ['2023.parquet', '2024.parquet']
+
+def test_load_range(tmp_path, bars):
+    store_history(bars, history_dir=tmp_path)
+    loaded = load_history(start_date='2023-12-30', end_date='2024-01-02', columns=['Close'], history_dir=tmp_path)
+    
+    assert list(loaded.columns) == ['Date', 'Close']
+    assert list(loaded['Date']) == list(pd.date_range('2023-12-30', '2024-01-02'))
+
+def test_only_new_days_are_appended(tmp_path, bars):
+    store_history(bars.iloc[:40], history_dir=tmp_path)
+    
+    changed = bars.assign(Close=bars['Close'] * 2)
+    assert store_history(changed, history_dir=tmp_path) == 20
+    
+    loaded = load_history(history_dir=tmp_path)
+    # Stored days are never rewritten
+    assert (loaded['Close'].iloc[:40].to_numpy() == bars['Close'].iloc[:40].to_numpy()).all()
+    assert (loaded['Close'].iloc[40:].to_numpy() == changed['Close'].iloc[40:].to_numpy()).all()
+
+def test_today_is_not_stored(tmp_path):
+    bars = make_ohlcv(3, start=utc_today() - pd.Timedelta(days=2))
+    
+    assert store_history(bars, history_dir=tmp_path) == 2
+    assert load_history(history_dir=tmp_path)['Date'].max() == utc_today() - pd.Timedelta(days=1)
+
+def test_missing_ranges(tmp_path, bars):
+    assert missing_ranges('bitcoin', '2023-12-01', '2023-12-05', tmp_path) == [
+        (pd.Timestamp('2023-12-01'), pd.Timestamp('2023-12-05'))
+    ]
+    
+    store_history(bars.drop(index=range(10, 15)), history_dir=tmp_path)
+    
+    assert missing_ranges('bitcoin', '2023-11-28', '2024-02-02', tmp_path) == [
+        (pd.Timestamp('2023-11-28'), pd.Timestamp('2023-11-30')),
+        (pd.Timestamp('2023-12-11'), pd.Timestamp('2023-12-15')),
+        (pd.Timestamp('2024-01-30'), pd.Timestamp('2024-02-02'))
+    ]
+    assert missing_ranges('bitcoin', '2023-12-16', '2024-01-29', tmp_path) == []
+
+def test_missing_ranges_fill_the_gaps(tmp_path, bars):
+    store_history(bars.iloc[:20], history_dir=tmp_path)
+    for start, end in missing_ranges('bitcoin', bars['Date'].iloc[0], bars['Date'].iloc[-1], tmp_path):
+        store_history(bars[bars['Date'].between(start, end)], history_dir=tmp_path)
+    
+    assert missing_ranges('bitcoin', bars['Date'].iloc[0], bars['Date'].iloc[-1], tmp_path) == []
+    pd.testing.assert_frame_equal(load_history(history_dir=tmp_path), bars, check_dtype=False)
@@ -0,0 +1,103 @@
+import json
+import time
+import pytest
+import requests
+from utils import http_client
+from utils.http_client import HttpClient, TokenBucket
+
+def make_response(status_code, payload=None, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(payload or {}).encode()
+    response.headers.update(headers or {})
+    response.url = 'http://stub/test'
+    
+    return response
+
+class StubSession:
+    """Stands in for requests.Session, replaying queued responses or exceptions"""
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+    
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((url, params))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Delays the client slept for, without actually sleeping"""
+    delays = []
+    monkeypatch.setattr(http_client.time, 'sleep', delays.append)
+    return delays
+
+def stub_client(*outcomes, **kwargs):
+    client = HttpClient('http://stub', rate_per_minute=6000, burst=100, **kwargs)
+    client.session = StubSession(*outcomes)
+    return client
+
+def test_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate=20, capacity=3)
+    start = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    burst = time.monotonic() - start
+    
+    for _ in range(4):
+        bucket.acquire()
+    paced = time.monotonic() - start
+    
+    assert burst < 0.05
+    # Four more tokens at 20 per second
+    assert 0.18 < paced < 0.5
+
+def test_bucket_times_out():
+    bucket = TokenBucket(rate=1, capacity=1)
+    assert bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=0.1)
+
+def test_bucket_block_pauses_and_drops_saved_tokens():
+    bucket = TokenBucket(rate=1000, capacity=5)
+    bucket.block(0.2)
+    
+    assert not bucket.acquire(timeout=0.1)
+    start = time.monotonic()
+    assert bucket.acquire(timeout=1)
+    assert time.monotonic() - start > 0.05
+
+def test_retries_transient_errors_then_succeeds(sleeps):
+    client = stub_client(
+        make_response(503), requests.ConnectionError(), make_response(200, {'price': 1}), backoff_base=1.0
+    )
+    
+    assert client.get_json('/simple/price', {'ids': 'bitcoin'}) == {'price': 1}
+    assert len(client.session.calls) == 3
+    assert client.session.calls[0] == ('http://stub/simple/price', {'ids': 'bitcoin'})
+    # Full jitter: each backoff lies between zero and base * 2 ** attempt
+    assert len(sleeps) == 2 and 0 <= sleeps[0] <= 1 and 0 <= sleeps[1] <= 2
+
+def test_retry_after_blocks_the_bucket_instead_of_backing_off(monkeypatch):
+    client = stub_client(make_response(429, headers={'Retry-After': '0.1'}), make_response(200, {'ok': True}))
+    monkeypatch.setattr(client, '_backoff', lambda attempt: pytest.fail("backed off despite Retry-After"))
+    start = time.monotonic()
+    
+    assert client.get_json('/x') == {'ok': True}
+    # The retry waited for the bucket, which the server's Retry-After paused
+    assert time.monotonic() - start >= 0.09
+
+def test_gives_up_after_max_retries(sleeps):
+    client = stub_client(*[make_response(500) for _ in range(3)], max_retries=2)
+    
+    with pytest.raises(requests.HTTPError):
+        client.get('/x')
+    assert len(client.session.calls) == 3
+
+def test_client_errors_are_not_retried(sleeps):
+    client = stub_client(make_response(404))
+    
+    with pytest.raises(requests.HTTPError):
+        client.get('/x')
+    assert len(client.session.calls) == 1 and sleeps == []
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+from utils.linear_model import StreamingLinearRegression
+
+@pytest.fixture
+def regression_data():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(3000, 6)) * [1, 10, 100, 1e3, 1e4, 1e5] + [0, 0, 0, 0, 0, 3e4]
+    y = X @ rng.normal(size=6) + 5 + rng.normal(scale=0.1, size=len(X))
+    
+    return X, y
+
+def assert_predictions_close(actual, expected, y):
+    # Relative to the target's scale; predictions near zero have no meaningful relative error
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-7 * np.abs(y).max())
+
+def test_fit_matches_sklearn(regression_data):
+    X, y = regression_data
+    model = StreamingLinearRegression().fit(X, y, chunksize=512)
+    reference = LinearRegression().fit(X, y)
+    
+    # The tiny ridge penalty (alpha) shifts the coefficients by a few parts per million
+    np.testing.assert_allclose(model.coef_, reference.coef_, rtol=1e-5)
+    assert_predictions_close(model.predict(X), reference.predict(X), y)
+
+def test_sliding_window_matches_refit(regression_data):
+    X, y = regression_data
+    model = StreamingLinearRegression().fit(X[:1000], y[:1000])
+    for start in range(100, 2001, 100):
+        model.partial_fit(X[start + 900:start + 1000], y[start + 900:start + 1000])
+        model.remove(X[start - 100:start], y[start - 100:start])
+    
+    reference = LinearRegression().fit(X[2000:3000], y[2000:3000])
+    assert_predictions_close(model.predict(X), reference.predict(X), y)
+
+def test_collinear_features_stay_solvable(regression_data):
+    X, y = regression_data
+    X = np.column_stack([X, X[:, -1]])
+    model = StreamingLinearRegression().fit(X, y)
+    reference = LinearRegression().fit(X, y)
+    
+    assert_predictions_close(model.predict(X), reference.predict(X), y)
+
+def test_predict_never_writes(regression_data):
+    X, y = regression_data
+    model = StreamingLinearRegression().partial_fit(X, y)
+    state = dict(vars(model))
+    model.predict(X[:5])
+    
+    assert vars(model).keys() == state.keys()
+    assert all(vars(model)[key] is value for key, value in state.items())
+
+def test_remove_checks_row_count(regression_data):
+    X, y = regression_data
+    model = StreamingLinearRegression().fit(X[:10], y[:10])
+    
+    with pytest.raises(ValueError):
+        model.remove(X[:11], y[:11])
+    
+    model.remove(X[:10], y[:10])
+    with pytest.raises(ValueError):
+        model.predict(X[:1])
@@ -0,0 +1,62 @@
+import gc
+import os
+import numpy as np
+import pytest
+from utils import model_registry
+from utils.model_registry import LazyModels, find_model, list_versions, register_model, warm_load
+from utils.model_training import ModelTrainer
+
+FEATURES = ['a', 'b', 'c', 'd']
+
+@pytest.fixture
+def trainer():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    y = X @ [1., 2., 3., 4.]
+    trainer = ModelTrainer()
+    trainer.train_model('Linear Regression', X[:200], y[:200], X[200:], y[200:])
+    
+    return trainer
+
+def versions(registry_dir):
+    return [metadata['version'] for metadata in list_versions('Linear Regression', registry_dir)]
+
+def test_prune_keeps_newest(tmp_path, trainer):
+    for i in range(4):
+        register_model(trainer, 'Linear Regression', FEATURES, f'data-{i}', registry_dir=tmp_path, keep=2)
+    
+    assert versions(tmp_path) == [4, 3]
+    assert find_model('Linear Regression', FEATURES, 'data-3', tmp_path)['version'] == 4
+    assert find_model('Linear Regression', FEATURES, 'data-0', tmp_path) is None
+
+def test_prune_spares_pending_entries(tmp_path, trainer):
+    register_model(trainer, 'Linear Regression', FEATURES, 'data-1', registry_dir=tmp_path, keep=2)
+    session = ModelTrainer()
+    assert warm_load(session, ['Linear Regression'], FEATURES, 'data-1', tmp_path)
+    assert isinstance(session.models, LazyModels)
+    
+    for i in range(2, 6):
+        register_model(trainer, 'Linear Regression', FEATURES, f'data-{i}', registry_dir=tmp_path, keep=2)
+    
+    # v1 is still pending in the session, so it and every newer version survive
+    assert versions(tmp_path) == [5, 4, 3, 2, 1]
+    X = np.ones((2, 4))
+    np.testing.assert_allclose(session.predict('Linear Regression', X), trainer.predict('Linear Regression', X))
+    
+    # Once the session drops the entry, the next registration prunes as usual
+    del session
+    gc.collect()
+    register_model(trainer, 'Linear Regression', FEATURES, 'data-6', registry_dir=tmp_path, keep=2)
+    assert versions(tmp_path) == [6, 5]
+    assert not model_registry._pending_versions
+
+def test_pruned_pending_entry_raises_clear_error(tmp_path, trainer):
+    register_model(trainer, 'Linear Regression', FEATURES, 'data-1', registry_dir=tmp_path)
+    session = ModelTrainer()
+    warm_load(session, ['Linear Regression'], FEATURES, 'data-1', tmp_path)
+    
+    # Deleted behind the registry's back, e.g. by another server process
+    os.remove(model_registry.model_path('Linear Regression', 1, tmp_path))
+    
+    with pytest.raises(FileNotFoundError, match='pruned'):
+        session.models['Linear Regression']
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils import data_preprocessing
+from utils.data_preprocessing import preprocess_data, preprocess_new_rows
+
+def _no_full_recompute(*args, **kwargs):
+    raise AssertionError("preprocess_new_rows fell back to preprocess_data")
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+@pytest.mark.parametrize('n_new', [1, 7, 60])
+def test_incremental_matches_full(ohlcv, dtype, n_new, monkeypatch):
+    full = preprocess_data(ohlcv, dtype=dtype)
+    history = preprocess_data(ohlcv.iloc[:-n_new], dtype=dtype)
+    
+    monkeypatch.setattr(data_preprocessing, 'preprocess_data', _no_full_recompute)
+    incremental = preprocess_new_rows(history, ohlcv)
+    
+    pd.testing.assert_frame_equal(incremental, full)
+    assert incremental.attrs['ewm_state'] == full.attrs['ewm_state']
+
+def test_incremental_chained_updates_match_full(ohlcv):
+    processed = preprocess_data(ohlcv.iloc[:300])
+    for end in range(310, len(ohlcv) + 1, 10):
+        processed = preprocess_new_rows(processed, ohlcv.iloc[:end])
+    
+    pd.testing.assert_frame_equal(processed, preprocess_data(ohlcv))
+
+def test_incremental_selected_columns(ohlcv):
+    columns = ['SMA_20', 'EMA_12', 'MACD_Signal', 'RSI']
+    full = preprocess_data(ohlcv, columns)
+    incremental = preprocess_new_rows(preprocess_data(ohlcv.iloc[:-5], columns), ohlcv)
+    
+    pd.testing.assert_frame_equal(incremental, full)
+
+def test_short_history_falls_back_to_full(ohlcv):
+    # Under 150 rows the SMA windows still depend on the row count
+    data = ohlcv.iloc[:120]
+    incremental = preprocess_new_rows(preprocess_data(data.iloc[:100]), data)
+    
+    pd.testing.assert_frame_equal(incremental, preprocess_data(data))
+
+def test_no_new_rows_returns_input(ohlcv):
+    processed = preprocess_data(ohlcv)
+    
+    assert preprocess_new_rows(processed, ohlcv) is processed
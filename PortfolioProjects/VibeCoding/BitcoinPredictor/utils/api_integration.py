@@ -1,86 +1,161 @@
-import requests
+import os
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import streamlit as st
 import time
+from utils.async_fetcher import COINGECKO_OHLC_INTERVAL, decode_market_chart, decode_ohlc, ohlc_days
+from utils.http_client import coingecko
+from utils.history_store import HISTORY_COLUMNS, load_history, missing_ranges, store_history, utc_today
+from utils.shared_cache import StaleWhileRevalidate
+
+# Seconds before the live metrics are refreshed (in the background) again
+LIVE_METRICS_TTL = float(os.environ.get('LIVE_METRICS_TTL', 60))
+
+def _coingecko_price():
+    """Current Bitcoin price data from CoinGecko; raises on failure"""
+    params = {
+        'ids': 'bitcoin',
+        'vs_currencies': 'usd',
+        'include_24hr_change': 'true',
+        'include_24hr_vol': 'true',
+        'include_last_updated_at': 'true'
+    }
+    
+    # Pooled, rate-limited and retried; see utils.http_client
+    data = coingecko.get_json('/simple/price', params=params, timeout=10)
+    
+    if 'bitcoin' in data:
+        btc_data = data['bitcoin']
+        return {
+            'price': btc_data.get('usd', 0),
+            'change_24h': btc_data.get('usd_24h_change', 0),
+            'volume_24h': btc_data.get('usd_24h_vol', 0),
+            'last_updated': btc_data.get('last_updated_at', int(time.time()))
+        }
+    
+    return None
 
 def fetch_bitcoin_price_coingecko():
     """Fetch current Bitcoin price from CoinGecko API"""
     try:
-        url = "https://api.coingecko.com/api/v3/simple/price"
-        params = {
-            'ids': 'bitcoin',
-            'vs_currencies': 'usd',
-            'include_24hr_change': 'true',
-            'include_24hr_vol': 'true',
-            'include_last_updated_at': 'true'
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if 'bitcoin' in data:
-            btc_data = data['bitcoin']
-            return {
-                'price': btc_data.get('usd', 0),
-                'change_24h': btc_data.get('usd_24h_change', 0),
-                'volume_24h': btc_data.get('usd_24h_vol', 0),
-                'last_updated': btc_data.get('last_updated_at', int(time.time()))
-            }
-        
-        return None
-        
+        return _coingecko_price()
     except Exception as e:
         st.error(f"Error fetching Bitcoin price: {str(e)}")
         return None
 
+def _day_of(timestamps):
+    """UTC day a point or candle closes: one stamped at midnight closes the day before"""
+    return (timestamps - pd.Timedelta(milliseconds=1)).dt.normalize()
+
+def _daily_ohlc_days(days):
+    """ohlc range covering days, capped where the candles stop being a day or shorter"""
+    return ohlc_days(days, 180 if COINGECKO_OHLC_INTERVAL == 'daily' else 30)
+
+def _daily_candles(candles):
+    """Daily Open/High/Low/Close of candles a day long or shorter, by the UTC day they close
+    
+    A first day the candles only partly cover is dropped (its range would be
+    too narrow); the last day may be today's, still forming. Coarser candles
+    cannot be split into days, so they give no rows.
+    """
+    columns = ['Date', 'Open', 'High', 'Low', 'Close']
+    if len(candles) == 0:
+        return pd.DataFrame(columns=columns)
+    
+    span = candles['Date'].diff().median() if len(candles) > 1 else pd.Timedelta(days=1)
+    if span > pd.Timedelta(days=1):
+        return pd.DataFrame(columns=columns)
+    
+    daily = candles.assign(Date=_day_of(candles['Date'])).groupby('Date', as_index=False).agg(
+        Open=('Open', 'first'), High=('High', 'max'), Low=('Low', 'min'), Close=('Close', 'last')
+    )
+    if candles['Date'].iloc[0] - span > daily['Date'].iloc[0]:
+        daily = daily.iloc[1:]
+    
+    return daily.reset_index(drop=True)
+
+def _merge_bars(chart, candles):
+    """Daily bars from market_chart prices and volumes, with High/Low from the ohlc candles
+    
+    Close and Volume are the last market_chart point of each UTC day and Open
+    is the previous day's Close. High/Low come from the candles and are widened
+    to include Open and Close, since the two endpoints are sampled apart. Days
+    without candles fall back to the range of Open and Close.
+    """
+    chart = chart.sort_values('Date')
+    bars = chart.assign(Date=_day_of(chart['Date'])).groupby('Date', as_index=False).agg(
+        Close=('Price', 'last'), Volume=('Volume', 'last')
+    )
+    daily = _daily_candles(candles)
+    bars = bars.merge(daily[['Date', 'Open', 'High', 'Low']], on='Date', how='left')
+    
+    bars['Open'] = bars['Close'].shift(1).fillna(bars['Open'])
+    bars['High'] = np.fmax(np.fmax(bars['High'], bars['Open']), bars['Close'])
+    bars['Low'] = np.fmin(np.fmin(bars['Low'], bars['Open']), bars['Close'])
+    bars['Adj Close'] = bars['Close']
+    
+    return bars.dropna(subset=['Open', 'Close'])[HISTORY_COLUMNS].reset_index(drop=True)
+
 def fetch_bitcoin_historical_coingecko(days=365):
-    """Fetch historical Bitcoin price data from CoinGecko API"""
+    """Fetch daily Bitcoin OHLCV bars for the last days days from CoinGecko
+    
+    Prices and volumes come from market_chart and the intraday range from
+    the ohlc endpoint; both responses are decoded as whole NumPy columns.
+    Bars are labelled by the UTC day they cover.
+    """
     try:
-        url = "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart"
+        # One day more than asked, for the first bar's Open
         params = {
             'vs_currency': 'usd',
-            'days': days,
+            'days': days + 1,
             'interval': 'daily'
         }
+        chart = decode_market_chart(coingecko.get_json('/coins/bitcoin/market_chart', params=params, timeout=30))
         
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        
-        data = response.json()
+        ohlc_params = {'vs_currency': 'usd', 'days': _daily_ohlc_days(days + 1)}
+        if COINGECKO_OHLC_INTERVAL:
+            ohlc_params['interval'] = COINGECKO_OHLC_INTERVAL
+        candles = decode_ohlc(coingecko.get_json('/coins/bitcoin/ohlc', params=ohlc_params, timeout=30))
         
-        # Extract prices and volumes
-        prices = data.get('prices', [])
-        volumes = data.get('total_volumes', [])
-        
-        # Create DataFrame
-        df_data = []
-        for i, (timestamp, price) in enumerate(prices):
-            date = datetime.fromtimestamp(timestamp / 1000)
-            volume = volumes[i][1] if i < len(volumes) else 0
-            
-            df_data.append({
-                'Date': date,
-                'Open': price,  # CoinGecko doesn't provide OHLC for free, using price as approximation
-                'High': price * 1.01,  # Approximate high
-                'Low': price * 0.99,   # Approximate low
-                'Close': price,
-                'Adj Close': price,
-                'Volume': volume
-            })
-        
-        df = pd.DataFrame(df_data)
-        df['Date'] = pd.to_datetime(df['Date'])
-        df = df.sort_values('Date').reset_index(drop=True)
-        
-        return df
+        return _merge_bars(chart, candles)
         
     except Exception as e:
         st.error(f"Error fetching historical Bitcoin data: {str(e)}")
         return None
 
+def get_bitcoin_history(days=365):
+    """Daily Bitcoin bars for the last days days, served from the local history store
+    
+    Only days missing from the store are downloaded (and then stored), so once
+    the store is warm a call fetches today's forming bar and nothing else.
+    CoinGecko serves "the last N days", so a single request starting at the
+    earliest gap covers every gap.
+    """
+    today = utc_today()
+    start = today - timedelta(days=days)
+    
+    fetched = None
+    gaps = missing_ranges('bitcoin', start, today - timedelta(days=1))
+    if gaps:
+        fetched = fetch_bitcoin_historical_coingecko(days=(today - gaps[0][0]).days + 1)
+        if fetched is not None:
+            store_history(fetched, 'bitcoin')
+    
+    history = load_history('bitcoin', start, today - timedelta(days=1))
+    
+    # Today's bar is never stored; take it from this download or a 1-day one
+    if fetched is None:
+        fetched = fetch_bitcoin_historical_coingecko(days=1)
+    if fetched is not None:
+        latest = fetched.assign(Date=fetched['Date'].dt.normalize())
+        history = pd.concat([history, latest[latest['Date'] >= today].tail(1)], ignore_index=True)
+    
+    if len(history) == 0:
+        return None
+    
+    return history.drop_duplicates('Date', keep='last').reset_index(drop=True)
+
 def update_data_with_latest_price(existing_data):
     """Update existing data with the latest Bitcoin price"""
     try:
@@ -91,14 +166,14 @@ def update_data_with_latest_price(existing_data):
         
         # Get the last date in existing data
         last_date = existing_data['Date'].max()
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        today = utc_today()
         
         # If last date is not today, add new rows
         if last_date.date() < today.date():
             days_to_add = (today - last_date).days
             
-            # Fetch recent historical data to fill the gap
-            recent_data = fetch_bitcoin_historical_coingecko(days=days_to_add + 1)
+            # Fill the gap from the local history store, downloading only what it lacks
+            recent_data = get_bitcoin_history(days=days_to_add + 1)
             
             if recent_data is not None:
                 # Filter only new dates
@@ -116,21 +191,32 @@ def update_data_with_latest_price(existing_data):
         st.error(f"Error updating data: {str(e)}")
         return existing_data
 
-def get_live_bitcoin_metrics():
-    """Get live Bitcoin metrics for dashboard display"""
-    try:
-        price_data = fetch_bitcoin_price_coingecko()
-        
-        if price_data:
-            return {
-                'current_price': price_data['price'],
-                'change_24h': price_data['change_24h'],
-                'volume_24h': price_data['volume_24h'],
-                'last_updated': datetime.fromtimestamp(price_data['last_updated']).strftime('%Y-%m-%d %H:%M:%S')
-            }
-        
-        return None
-        
-    except Exception as e:
-        st.error(f"Error getting live metrics: {str(e)}")
+def _live_metrics():
+    """Live metrics straight from CoinGecko; runs in the background refresh thread"""
+    price_data = _coingecko_price()
+    if not price_data:
         return None
+    
+    return {
+        'current_price': price_data['price'],
+        'change_24h': price_data['change_24h'],
+        'volume_24h': price_data['volume_24h'],
+        'last_updated': datetime.fromtimestamp(price_data['last_updated']).strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+# Shared by every session: reruns read the last value, one background refresh per TTL hits the API
+live_metrics_cache = StaleWhileRevalidate(_live_metrics, LIVE_METRICS_TTL)
+
+def get_live_bitcoin_metrics():
+    """Get live Bitcoin metrics for dashboard display
+    
+    Served from live_metrics_cache without waiting on the network, except on
+    the server's very first call; may be up to LIVE_METRICS_TTL seconds old
+    plus one refresh.
+    """
+    live_metrics = live_metrics_cache.get()
+    
+    if live_metrics is None and live_metrics_cache.error:
+        st.error(f"Error getting live metrics: {live_metrics_cache.error}")
+    
+    return live_metrics
@@ -0,0 +1,168 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from utils.http_client import coingecko
+
+# Requests in flight at once across the whole server process (at most the client's connection pool)
+COINGECKO_CONCURRENCY = int(os.environ.get('COINGECKO_CONCURRENCY', 8))
+
+# Coin ids per /simple/price request; one request prices a whole batch
+PRICE_BATCH_IDS = 100
+
+ENDPOINTS = ['price', 'market_chart', 'ohlc']
+
+# Ranges the ohlc endpoint accepts; other day counts are rounded up to one of them
+OHLC_DAYS = [1, 7, 14, 30, 90, 180, 365]
+
+# 'daily' on paid CoinGecko plans; without it candles are 30 min to 4 h up to 30 days and 4 days beyond
+COINGECKO_OHLC_INTERVAL = os.environ.get('COINGECKO_OHLC_INTERVAL') or None
+
+# Every fetch of every session shares these workers, so the limit is global
+_executor = ThreadPoolExecutor(max_workers=COINGECKO_CONCURRENCY, thread_name_prefix='coingecko')
+
+def ohlc_days(days, longest=OHLC_DAYS[-1]):
+    """Shortest ohlc range covering days, or covering longest when days is more"""
+    return next(allowed for allowed in OHLC_DAYS if allowed >= min(days, longest))
+
+def _points_frame(points, column):
+    """[[timestamp_ms, value], ...] as a Date column and a value column, decoded in one pass"""
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    frame = pd.DataFrame({'Date': pd.to_datetime(points[:, 0].astype(np.int64), unit='ms'), column: points[:, 1]})
+    return frame.drop_duplicates('Date', keep='last')
+
+def decode_market_chart(data):
+    """Prices, market caps and volumes of a market_chart response as one frame, joined on Date"""
+    frame = _points_frame(data.get('prices', []), 'Price')
+    for key, column in (('market_caps', 'Market Cap'), ('total_volumes', 'Volume')):
+        frame = frame.merge(_points_frame(data.get(key, []), column), on='Date', how='outer')
+    
+    return frame.sort_values('Date').reset_index(drop=True)
+
+def decode_ohlc(data):
+    """[[timestamp_ms, open, high, low, close], ...] from the ohlc endpoint as a frame"""
+    bars = np.asarray(data, dtype=float).reshape(-1, 5)
+    frame = pd.DataFrame({
+        'Date': pd.to_datetime(bars[:, 0].astype(np.int64), unit='ms'),
+        'Open': bars[:, 1],
+        'High': bars[:, 2],
+        'Low': bars[:, 3],
+        'Close': bars[:, 4]
+    })
+    
+    return frame.drop_duplicates('Date', keep='last').sort_values('Date').reset_index(drop=True)
+
+def decode_price(data, vs_currencies):
+    """A /simple/price response as one row per (asset, currency)"""
+    rows = [
+        {
+            'Asset': coin_id,
+            'Currency': currency,
+            'Price': quote.get(currency, np.nan),
+            'Market Cap': quote.get(f'{currency}_market_cap', np.nan),
+            'Volume 24h': quote.get(f'{currency}_24h_vol', np.nan),
+            'Change 24h': quote.get(f'{currency}_24h_change', np.nan),
+            'Last Updated': pd.to_datetime(quote.get('last_updated_at'), unit='s')
+        }
+        for coin_id, quote in data.items()
+        for currency in vs_currencies
+        if currency in quote
+    ]
+    
+    return pd.DataFrame(rows, columns=['Asset', 'Currency', 'Price', 'Market Cap', 'Volume 24h', 'Change 24h', 'Last Updated'])
+
+def _tagged(frame, coin_id, currency):
+    return frame.assign(Asset=coin_id, Currency=currency)[['Asset', 'Currency'] + list(frame.columns)]
+
+def _requests(coin_ids, vs_currencies, endpoints, days, interval):
+    """(endpoint, coin_id, currency, path, params) of every request; prices are batched, the rest are per pair"""
+    requests = []
+    if 'price' in endpoints:
+        for start in range(0, len(coin_ids), PRICE_BATCH_IDS):
+            params = {
+                'ids': ','.join(coin_ids[start:start + PRICE_BATCH_IDS]),
+                'vs_currencies': ','.join(vs_currencies),
+                'include_market_cap': 'true',
+                'include_24hr_vol': 'true',
+                'include_24hr_change': 'true',
+                'include_last_updated_at': 'true'
+            }
+            requests.append(('price', None, None, '/simple/price', params))
+    
+    for coin_id in coin_ids:
+        for currency in vs_currencies:
+            if 'market_chart' in endpoints:
+                params = {'vs_currency': currency, 'days': days}
+                if interval is not None:
+                    params['interval'] = interval
+                requests.append(('market_chart', coin_id, currency, f'/coins/{coin_id}/market_chart', params))
+            if 'ohlc' in endpoints:
+                params = {'vs_currency': currency, 'days': ohlc_days(days)}
+                if COINGECKO_OHLC_INTERVAL:
+                    params['interval'] = COINGECKO_OHLC_INTERVAL
+                requests.append(('ohlc', coin_id, currency, f'/coins/{coin_id}/ohlc', params))
+    
+    return requests
+
+def _decode(endpoint, coin_id, currency, data, vs_currencies):
+    if endpoint == 'price':
+        return decode_price(data, vs_currencies)
+    if endpoint == 'market_chart':
+        return _tagged(decode_market_chart(data), coin_id, currency)
+    
+    return _tagged(decode_ohlc(data), coin_id, currency)
+
+async def fetch_market_data_async(coin_ids, vs_currencies=('usd',), endpoints=ENDPOINTS, days=365, interval=None,
+                                  client=coingecko):
+    """Fetch endpoints for every coin id and currency concurrently
+    
+    Requests go through client, so they share its connection pool, retries
+    and rate limit, and run on the process-wide pool of COINGECKO_CONCURRENCY
+    workers. Concurrency hides latency; the client's rate limit still caps
+    the requests per minute (raise COINGECKO_RATE_PER_MINUTE on a paid plan).
+    
+    Args:
+        coin_ids: CoinGecko coin ids, e.g. ['bitcoin', 'ethereum']
+        vs_currencies: Quote currencies, e.g. ['usd', 'eur']
+        endpoints: Any of 'price', 'market_chart' and 'ohlc'
+        days: History length for market_chart and ohlc (rounded up to a range
+            the ohlc endpoint accepts, see ohlc_days)
+        interval: Optional market_chart interval, e.g. 'daily'
+    
+    Returns a dict with one long DataFrame per endpoint, whose Asset and
+    Currency columns (categorical) say which pair each row belongs to, and
+    'errors': (endpoint, coin_id, currency, message) of each failed request.
+    """
+    coin_ids, vs_currencies = list(coin_ids), [currency.lower() for currency in vs_currencies]
+    loop = asyncio.get_running_loop()
+    
+    async def fetch(endpoint, coin_id, currency, path, params):
+        try:
+            data = await loop.run_in_executor(_executor, client.get_json, path, params)
+            return endpoint, _decode(endpoint, coin_id, currency, data, vs_currencies), None
+        except Exception as e:
+            return endpoint, None, (endpoint, coin_id, currency, str(e))
+    
+    results = await asyncio.gather(*(fetch(*request) for request in _requests(coin_ids, vs_currencies, endpoints, days, interval)))
+    
+    frames = {endpoint: [] for endpoint in endpoints}
+    errors = []
+    for endpoint, frame, error in results:
+        if error is not None:
+            errors.append(error)
+        elif len(frame):
+            frames[endpoint].append(frame)
+    
+    data = {
+        endpoint: pd.concat(endpoint_frames, ignore_index=True).astype({'Asset': 'category', 'Currency': 'category'})
+        if endpoint_frames else pd.DataFrame(columns=['Asset', 'Currency'])
+        for endpoint, endpoint_frames in frames.items()
+    }
+    data['errors'] = errors
+    
+    return data
+
+def fetch_market_data(coin_ids, vs_currencies=('usd',), endpoints=ENDPOINTS, days=365, interval=None, client=coingecko):
+    """Blocking wrapper of fetch_market_data_async, for callers without an event loop (e.g. Streamlit pages)"""
+    return asyncio.run(fetch_market_data_async(coin_ids, vs_currencies, endpoints, days, interval, client))
@@ -0,0 +1,162 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from utils.linear_model import StreamingLinearRegression
+from utils.model_training import THREAD_LIMIT_VARIABLES, ModelTrainer
+
+# Prophet trains on dates rather than the feature matrix, so it has no walk-forward folds
+WALK_FORWARD_MODELS = ['Linear Regression', 'Random Forest', 'XGBoost', 'LSTM']
+
+# Feature matrix and target of a pool worker, sent once when the worker starts
+_worker_data = {}
+
+def walk_forward_folds(n_samples, start, refit_every=30, window=None):
+    """(train_start, test_start, test_end) of each fold of a walk-forward test
+    
+    The rows from start on are predicted refit_every at a time, each block by a
+    model fitted on the rows before it: all of them (expanding window) or the
+    last window rows (rolling window).
+    """
+    folds = []
+    for test_start in range(start, n_samples, refit_every):
+        train_start = 0 if window is None else max(0, test_start - window)
+        folds.append((train_start, test_start, min(test_start + refit_every, n_samples)))
+    
+    return folds
+
+def _predict_steps(trainer, model_name, X, test_start, test_end):
+    """One prediction per row of X[test_start:test_end], each from the data up to that row"""
+    if model_name != 'LSTM':
+        return trainer.predict(model_name, X[test_start:test_end])
+    
+    # Each step's sequence ends at its own row, so the windows reach back into the training rows
+    scaler_info = trainer.scalers['LSTM']
+    sequence_length = scaler_info['sequence_length']
+    X_scaled = scaler_info['X'].transform(X[test_start - sequence_length + 1:test_end]).astype(np.float32)
+    sequences = sliding_window_view(X_scaled, sequence_length, axis=0).transpose(0, 2, 1)
+    
+    pred_scaled = trainer.models['LSTM'].predict(sequences, verbose=0)
+    return scaler_info['y'].inverse_transform(pred_scaled).ravel()
+
+def _validation_start(fold, validation_size=0.1):
+    """First validation row of a fold: the last validation_size of its training rows are held out"""
+    train_start, test_start, _ = fold
+    return test_start - max(1, int((test_start - train_start) * validation_size))
+
+def _fold_job(model_name, fold, X, y, n_jobs=1):
+    """Fit model_name on a fold's training rows and predict its test rows
+    
+    The held-out validation rows are the validation set the trainers expect
+    (LSTM stops early on it).
+    """
+    train_start, test_start, test_end = fold
+    val_start = _validation_start(fold)
+    
+    # Views of the shared matrix; nothing is copied per fold. Failures raise, so the fold reports them
+    trainer = ModelTrainer(raise_errors=True)
+    metrics = trainer.train_model(
+        model_name, X[train_start:val_start], y[train_start:val_start], X[val_start:test_start], y[val_start:test_start],
+        n_jobs=n_jobs
+    )
+    if metrics is None:
+        raise ValueError(f"skipped: too few training rows ({val_start - train_start}) in the fold from row {train_start}")
+    
+    return np.asarray(_predict_steps(trainer, model_name, X, test_start, test_end), dtype=float)
+
+def _walk_forward_linear(folds, X, y):
+    """Linear Regression folds from a single streaming model slid from fold to fold
+    
+    Only the rows entering and leaving the training window are added or
+    removed, so each fold costs O(refit_every x F²) instead of a refit on every
+    training row. Gives the same fits as training each fold on its own.
+    """
+    model = StreamingLinearRegression()
+    first_row, end_row = 0, 0
+    
+    for fold in folds:
+        train_start, test_start, test_end = fold
+        val_start = _validation_start(fold)
+        
+        try:
+            model.partial_fit(X[end_row:val_start], y[end_row:val_start])
+            model.remove(X[first_row:train_start], y[first_row:train_start])
+            first_row, end_row = train_start, val_start
+            
+            yield 'Linear Regression', fold, model.predict(X[test_start:test_end]), None
+        except Exception as e:
+            yield 'Linear Regression', fold, None, str(e)
+
+def _init_worker(X, y, n_threads):
+    for variable in THREAD_LIMIT_VARIABLES:
+        os.environ[variable] = str(n_threads)
+    
+    _worker_data['X'] = X
+    _worker_data['y'] = y
+    _worker_data['n_threads'] = n_threads
+
+def _pooled_fold_job(model_name, fold):
+    return _fold_job(model_name, fold, _worker_data['X'], _worker_data['y'], _worker_data['n_threads'])
+
+def walk_forward_backtest(model_names, X, y, start, refit_every=30, window=None, max_workers=None):
+    """Walk-forward test of model_names, yielding (model_name, fold, predictions, error) per fold
+    
+    Every model is refitted every refit_every rows on an expanding (window=None)
+    or rolling window of earlier rows, and predicts each row of the next block;
+    stitched together, a model's folds give one out-of-sample prediction per row
+    from start on. predictions is None when the fold's training was skipped or
+    failed, and error then says why.
+    
+    Folds run in a process pool, one core share per worker. X and y are sent
+    to each worker once, not per fold. Linear Regression instead updates one
+    streaming model from fold to fold, in this process.
+    
+    Args:
+        X, y: Feature matrix and target, as from create_features_target
+        start: First row to predict; earlier rows only ever train
+        max_workers: Concurrent folds; defaults to one per core. With a single
+            worker the folds run here, in order, without a pool.
+    """
+    folds = walk_forward_folds(len(X), start, refit_every, window)
+    
+    # Linear Regression slides one model along here; the other models refit per fold
+    if 'Linear Regression' in model_names:
+        yield from _walk_forward_linear(folds, X, y)
+    
+    jobs = [(model_name, fold) for model_name in model_names if model_name != 'Linear Regression' for fold in folds]
+    if not jobs:
+        return
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(jobs)))
+    
+    if workers == 1:
+        for model_name, fold in jobs:
+            try:
+                yield model_name, fold, _fold_job(model_name, fold, X, y, n_jobs=os.cpu_count() or 1), None
+            except Exception as e:
+                yield model_name, fold, None, str(e)
+        return
+    
+    # Long-lived workers (unlike training's one process per model): there are many small folds
+    n_threads = max(1, (os.cpu_count() or 1) // workers)
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(np.asarray(X), np.asarray(y), n_threads)) as pool:
+        futures = {pool.submit(_pooled_fold_job, model_name, fold): (model_name, fold) for model_name, fold in jobs}
+        
+        for future in as_completed(futures):
+            model_name, fold = futures[future]
+            try:
+                yield model_name, fold, future.result(), None
+            except Exception as e:
+                yield model_name, fold, None, str(e)
+
+def stitch_predictions(fold_results, n_samples, start):
+    """Out-of-sample predictions for rows start..n_samples - 1 per model, NaN where a fold failed"""
+    predictions = {}
+    for model_name, (_, test_start, test_end), fold_predictions, _ in fold_results:
+        series = predictions.setdefault(model_name, np.full(n_samples - start, np.nan))
+        if fold_predictions is not None:
+            series[test_start - start:test_end - start] = fold_predictions
+    
+    return predictions
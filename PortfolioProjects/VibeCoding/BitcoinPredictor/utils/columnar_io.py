@@ -0,0 +1,90 @@
+import io
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+COLUMNAR_FORMATS = {
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather'
+}
+
+# Rows per Parquet row group; Date range filters skip whole row groups by their statistics
+PARQUET_ROW_GROUP_ROWS = 64 * 1024
+
+def columnar_format(name):
+    """'parquet' or 'feather' for a file name, None for anything else (e.g. CSV)"""
+    return COLUMNAR_FORMATS.get(os.path.splitext(str(name))[1].lower())
+
+def _date_bounds(start_date, end_date):
+    """Inclusive Date bounds as (operator, timestamp) pairs"""
+    bounds = []
+    if start_date is not None:
+        bounds.append(('>=', pd.Timestamp(start_date)))
+    if end_date is not None:
+        bounds.append(('<=', pd.Timestamp(end_date)))
+    
+    return bounds
+
+def _schema_names(source, file_format):
+    """Column names in the file's schema, read from its footer without decoding any data"""
+    if file_format == 'parquet':
+        names = pq.read_schema(source).names
+    else:
+        names = pa.ipc.open_file(source).schema.names
+    
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    
+    return names
+
+def read_columnar(source, file_format='parquet', columns=None, start_date=None, end_date=None):
+    """Read a Parquet or Feather file into a DataFrame
+    
+    Requested columns the file does not have are left out rather than raising,
+    so callers can report them; without a Date column the range is not applied.
+    
+    Args:
+        source: Path or file-like object
+        file_format: 'parquet' or 'feather'
+        columns: Columns to read (Date is always included); all when None
+        start_date, end_date: Optional inclusive Date range. For Parquet the
+            range is pushed down, so row groups outside it are never decoded.
+    """
+    names = _schema_names(source, file_format)
+    if columns is not None:
+        columns = [column for column in ['Date'] + [column for column in columns if column != 'Date'] if column in names]
+    
+    bounds = _date_bounds(start_date, end_date) if 'Date' in names else []
+    
+    if file_format == 'parquet':
+        filters = [('Date', op, value) for op, value in bounds] or None
+        table = pq.read_table(source, columns=columns, filters=filters)
+    else:
+        table = feather.read_table(source, columns=columns, memory_map=isinstance(source, str))
+        
+        # Feather has no statistics, so the range is applied after reading the projected columns
+        for op, value in bounds:
+            scalar = pa.scalar(value, type=table.schema.field('Date').type)
+            table = table.filter(pc.greater_equal(table['Date'], scalar) if op == '>=' else pc.less_equal(table['Date'], scalar))
+    
+    return table.to_pandas()
+
+def write_columnar(df, destination=None, file_format='parquet'):
+    """Write a DataFrame as Parquet or Feather
+    
+    Returns the file's bytes when destination is None (e.g. for a download button).
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = io.BytesIO() if destination is None else destination
+    
+    if file_format == 'parquet':
+        pq.write_table(table, sink, row_group_size=PARQUET_ROW_GROUP_ROWS, compression='zstd')
+    else:
+        feather.write_feather(table, sink, compression='zstd')
+    
+    return sink.getvalue() if destination is None else None
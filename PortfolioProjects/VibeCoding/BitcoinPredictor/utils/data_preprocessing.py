@@ -1,140 +1,654 @@
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime, timedelta
 import streamlit as st
+from utils.columnar_io import read_columnar
+from utils.feature_store import FeatureStore, frame_matrix
 
-def load_csv_data(uploaded_file):
-    """Load and validate CSV data"""
+REQUIRED_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+# Explicit column types, so chunks never need dtype inference (or upcasting) to agree
+PRICE_DTYPES = {
+    'Open': 'float64',
+    'High': 'float64',
+    'Low': 'float64',
+    'Close': 'float64',
+    'Adj Close': 'float64',
+    'Volume': 'float64'
+}
+
+# Rows parsed per chunk by load_csv_data
+CSV_CHUNK_ROWS = 1_000_000
+
+def _parse_dates(dates, date_format):
+    """Parse a chunk's Date strings with a format guessed once for the whole file"""
+    if date_format is not None:
+        try:
+            return pd.to_datetime(dates, format=date_format)
+        except (ValueError, TypeError):
+            pass
+    
+    return pd.to_datetime(dates)
+
+def _daily_bars(chunk):
+    """Aggregate one chunk to partial daily bars, keeping when each day starts and ends"""
+    chunk = chunk.assign(Day=chunk['Date'].dt.normalize())
+    grouped = chunk.groupby('Day', sort=False)
+    first = chunk.loc[grouped['Date'].idxmin()].set_index('Day')
+    last = chunk.loc[grouped['Date'].idxmax()].set_index('Day')
+    
+    bars = pd.DataFrame({
+        'First': first['Date'],
+        'Last': last['Date'],
+        'Open': first['Open'],
+        'High': grouped['High'].max(),
+        'Low': grouped['Low'].min(),
+        'Close': last['Close'],
+        'Volume': grouped['Volume'].sum()
+    })
+    if 'Adj Close' in chunk.columns:
+        bars['Adj Close'] = last['Adj Close']
+    
+    return bars
+
+def _merge_daily_bars(partials):
+    """Combine partial daily bars from every chunk; a day can span chunk boundaries"""
+    bars = pd.concat(partials).reset_index()
+    grouped = bars.groupby('Day', sort=True)
+    first = bars.loc[grouped['First'].idxmin()].set_index('Day')
+    last = bars.loc[grouped['Last'].idxmax()].set_index('Day')
+    
+    daily = pd.DataFrame({
+        'Open': first['Open'],
+        'High': grouped['High'].max(),
+        'Low': grouped['Low'].min(),
+        'Close': last['Close'],
+        'Volume': grouped['Volume'].sum()
+    })
+    if 'Adj Close' in bars.columns:
+        daily.insert(4, 'Adj Close', last['Adj Close'])
+    
+    return daily.rename_axis('Date').reset_index()
+
+def load_csv_data(uploaded_file, resample_daily=False, chunksize=CSV_CHUNK_ROWS):
+    """Load and validate CSV data
+    
+    The file is streamed in typed chunks, so a large intraday export is never
+    parsed in one piece.
+    
+    Args:
+        uploaded_file: Path or file-like object
+        resample_daily: Aggregate the rows to daily OHLCV bars chunk by chunk,
+            so only the daily bars are ever held in memory
+        chunksize: Rows per chunk
+    """
     try:
-        df = pd.read_csv(uploaded_file)
+        chunks = []
+        date_format = None
+        is_sorted = True
+        last_date = None
+        
+        reader = pd.read_csv(uploaded_file, dtype=PRICE_DTYPES, chunksize=chunksize)
+        for i, chunk in enumerate(reader):
+            # Check required columns
+            missing_columns = [col for col in REQUIRED_COLUMNS if col not in chunk.columns]
+            
+            if missing_columns:
+                st.error(f"Missing required columns: {missing_columns}")
+                return None
+            
+            # Convert Date column
+            if date_format is None and len(chunk):
+                date_format = pd.tseries.api.guess_datetime_format(str(chunk['Date'].iloc[0]))
+            chunk['Date'] = _parse_dates(chunk['Date'], date_format)
+            
+            if chunk['Date'].isna().any():
+                row = chunk.index[chunk['Date'].isna()][0] + 2
+                st.error(f"Invalid date on line {row} (chunk {i + 1})")
+                return None
+            
+            # Track whether the file is already in date order
+            if len(chunk):
+                is_sorted = (is_sorted and chunk['Date'].is_monotonic_increasing
+                             and (last_date is None or last_date <= chunk['Date'].iloc[0]))
+                last_date = chunk['Date'].iloc[-1]
+            
+            chunks.append(_daily_bars(chunk) if resample_daily else chunk)
+        
+        if resample_daily:
+            return _merge_daily_bars(chunks)
+        
+        df = pd.concat(chunks, ignore_index=True)
+        
+        # Sort by date, unless the file was already in order
+        if not is_sorted:
+            df = df.sort_values('Date').reset_index(drop=True)
+        
+        return df
+    
+    except Exception as e:
+        st.error(f"Error loading CSV: {str(e)}")
+        return None
+
+def load_columnar_data(uploaded_file, file_format='parquet', columns=None, start_date=None, end_date=None):
+    """Load and validate Parquet or Feather data
+    
+    Args:
+        columns: Columns to read; all when None. Raw OHLCV columns are always read.
+        start_date, end_date: Optional inclusive Date range, pushed down into the reader
+    """
+    try:
+        if columns is not None:
+            columns = REQUIRED_COLUMNS + [col for col in columns if col not in REQUIRED_COLUMNS]
+        df = read_columnar(uploaded_file, file_format, columns, start_date, end_date)
         
         # Check required columns
-        required_columns = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
         
         if missing_columns:
             st.error(f"Missing required columns: {missing_columns}")
             return None
         
-        # Convert Date column
-        df['Date'] = pd.to_datetime(df['Date'])
+        # Dates are normally stored typed; convert only when they are not
+        if not pd.api.types.is_datetime64_dtype(df['Date']):
+            df['Date'] = pd.to_datetime(df['Date'])
         
-        # Sort by date
-        df = df.sort_values('Date').reset_index(drop=True)
+        # Sort by date, unless the file was already in order
+        if not df['Date'].is_monotonic_increasing:
+            df = df.sort_values('Date').reset_index(drop=True)
         
         return df
     
     except Exception as e:
-        st.error(f"Error loading CSV: {str(e)}")
+        st.error(f"Error loading {file_format.capitalize()} file: {str(e)}")
         return None
 
-def calculate_technical_indicators(df):
-    """Calculate technical indicators for the dataset"""
-    df = df.copy()
+# History rows needed to recompute every indicator for a newly appended row
+INDICATOR_LOOKBACK = 50
+
+# Rows per block in the rolling kernel, sized so a block stays in CPU cache
+ROLLING_BLOCK_ROWS = 1 << 15
+
+def _rolling_stats(values, mean_windows=(), std_windows=()):
+    """Rolling means and sample standard deviations (ddof=1) for several windows
     
-    # Determine maximum window size based on available data
-    n_rows = len(df)
+    Every window sum comes out of a single left-to-right sweep over the data, so
+    each row depends only on the values in its own window (batch and incremental
+    runs agree bit for bit) and each window size is summed once. The sweep runs
+    over cache-sized blocks of rows rather than the whole array.
+    """
+    values = np.asarray(values, dtype=float)
+    n_rows = len(values)
+    wanted = set(mean_windows) | set(std_windows)
+    largest = min(max(wanted, default=0), n_rows)
+    
+    stats = {(window, 'mean'): np.full(n_rows, np.nan) for window in wanted}
+    stats.update({(window, 'std'): np.full(n_rows, np.nan) for window in std_windows})
+    
+    for start in range(0, n_rows, ROLLING_BLOCK_ROWS):
+        # Windows that begin in this block, plus the rows they reach into
+        block = values[start:start + ROLLING_BLOCK_ROWS + largest - 1]
+        total = block.copy()
+        
+        for window in range(1, min(largest, len(block)) + 1):
+            if window > 1:
+                total[:len(block) - window + 1] += block[window - 1:]
+            if window in wanted:
+                count = min(ROLLING_BLOCK_ROWS, len(block) - window + 1)
+                first = start + window - 1
+                np.divide(total[:count], window, out=stats[(window, 'mean')][first:first + count])
+        
+        for window in std_windows:
+            count = min(ROLLING_BLOCK_ROWS, len(block) - window + 1)
+            if window < 2 or count <= 0:
+                continue
+            
+            first = start + window - 1
+            mean = stats[(window, 'mean')][first:first + count]
+            squares = np.zeros(count)
+            for offset in range(window):
+                deviation = block[offset:offset + count] - mean
+                squares += deviation * deviation
+            np.sqrt(squares / (window - 1), out=stats[(window, 'std')][first:first + count])
+    
+    return stats
+
+def _compute_rolling(sources, keys):
+    """Compute each distinct (source, window, statistic) once, one sweep per source"""
+    stats = {}
+    
+    for source in {key[0] for key in keys}:
+        mean_windows = [window for name, window, stat in keys if name == source and stat == 'mean']
+        std_windows = [window for name, window, stat in keys if name == source and stat == 'std']
+        
+        for (window, stat), values in _rolling_stats(sources[source], mean_windows, std_windows).items():
+            stats[(source, window, stat)] = values
+    
+    return stats
+
+def _lag(values, periods):
+    """Shift values down by periods rows, padding with NaN"""
+    result = np.full(len(values), np.nan)
+    if periods < len(values):
+        result[periods:] = values[:len(values) - periods]
+    
+    return result
+
+def _ewm_decay(span):
+    """Per-step weight decay for a span, derived the same way pandas does"""
+    com = (span - 1) / 2.0
+    return 1. - 1. / (1. + com)
+
+def _ewm_weight(n_obs, span):
+    """Accumulated adjust=True EWM weight after n_obs observations, as pandas tracks it"""
+    old_wt_factor = _ewm_decay(span)
+    old_wt = 1.
+    
+    for _ in range(n_obs - 1):
+        new_wt = old_wt * old_wt_factor + 1.
+        if new_wt == old_wt:
+            # Weight has converged, further observations leave it unchanged
+            break
+        old_wt = new_wt
+    
+    return old_wt
+
+def _ewm_continue(values, span, last_value, n_obs):
+    """Continue an adjust=True EWM mean from its last value over new observations"""
+    old_wt_factor = _ewm_decay(span)
+    old_wt = _ewm_weight(n_obs, span)
+    weighted = last_value
+    result = np.empty(len(values))
+    
+    # Same update sequence as pandas' ewm kernel so results match the batch path exactly
+    for i, cur in enumerate(values):
+        old_wt *= old_wt_factor
+        if weighted != cur:
+            weighted = old_wt * weighted + cur
+            weighted /= (old_wt + 1.)
+        old_wt += 1.
+        result[i] = weighted
+    
+    return result
+
+def _indicator_windows(n_rows):
+    """Rolling window sizes for the SMA features given the amount of data"""
     max_window = min(50, n_rows // 3)  # Use at most 1/3 of data for rolling windows
     
+    return {
+        'SMA_5': min(5, max_window),
+        'SMA_10': min(10, max_window),
+        'SMA_20': min(20, max_window),
+        'SMA_50': 50 if n_rows >= 50 else max_window
+    }
+
+def _rolling_plan(windows):
+    """Declare every rolling feature once as column -> (source, window, statistic)
+    
+    Columns sharing a key (SMA_20, BB_Middle and Close_Rolling_Mean_20, say) are
+    computed once and aliased.
+    """
+    plan = {column: ('Close', window, 'mean') for column, window in windows.items()}
+    plan['BB_Middle'] = ('Close', 20, 'mean')
+    plan['Volume_SMA'] = ('Volume', 20, 'mean')
+    plan['Volatility'] = ('Close', 20, 'std')
+    
+    for window in [5, 10, 20]:
+        plan[f'Close_Rolling_Mean_{window}'] = ('Close', window, 'mean')
+        plan[f'Close_Rolling_Std_{window}'] = ('Close', window, 'std')
+        plan[f'Volume_Rolling_Mean_{window}'] = ('Volume', window, 'mean')
+    
+    return plan
+
+# Rolling statistics used by RSI and the Bollinger Bands but not stored as columns
+RSI_GAIN = ('Gain', 14, 'mean')
+RSI_LOSS = ('Loss', 14, 'mean')
+BB_STD = ('Close', 20, 'std')
+
+# Raw OHLCV inputs the indicators are built from
+RAW_INPUTS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Intermediate series shared by several indicators but not stored as columns
+INTERMEDIATES = ['Delta', 'Gain', 'Loss']
+
+# Indicators carried forward from their previous value rather than recomputed
+EWM_COLUMNS = ['EMA_12', 'EMA_26', 'MACD_Signal']
+
+def _feature_registry(windows, ewm=None):
+    """Every indicator as name -> (dependencies, builder), in output column order
+    
+    A builder receives the arrays of its dependencies in order. Tuple names are
+    rolling (source, window, statistic) keys without a builder: they are
+    evaluated together through _compute_rolling so each source is swept once.
+    """
+    plan = _rolling_plan(windows)
+    
+    def rolling(column):
+        return ((plan[column],), lambda values: values)
+    
+    registry = {
+        'Delta': (('Close',), lambda close: np.diff(close, prepend=np.nan)),
+        'Gain': (('Delta',), lambda delta: np.where(delta > 0, delta, 0.)),
+        'Loss': (('Delta',), lambda delta: -np.where(delta < 0, delta, 0.))
+    }
+    for key in set(plan.values()) | {RSI_GAIN, RSI_LOSS, BB_STD}:
+        registry[key] = ((key[0],), None)
+    
     # Simple Moving Averages (adjust windows based on available data)
-    df['SMA_5'] = df['Close'].rolling(window=min(5, max_window)).mean()
-    df['SMA_10'] = df['Close'].rolling(window=min(10, max_window)).mean()
-    df['SMA_20'] = df['Close'].rolling(window=min(20, max_window)).mean()
-    if n_rows >= 50:
-        df['SMA_50'] = df['Close'].rolling(window=50).mean()
-    else:
-        df['SMA_50'] = df['Close'].rolling(window=max_window).mean()
-    
-    # Exponential Moving Averages
-    df['EMA_12'] = df['Close'].ewm(span=12).mean()
-    df['EMA_26'] = df['Close'].ewm(span=26).mean()
-    
-    # MACD
-    df['MACD'] = df['EMA_12'] - df['EMA_26']
-    df['MACD_Signal'] = df['MACD'].ewm(span=9).mean()
-    df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
-    
-    # RSI
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-    
-    # Bollinger Bands
-    df['BB_Middle'] = df['Close'].rolling(window=20).mean()
-    bb_std = df['Close'].rolling(window=20).std()
-    df['BB_Upper'] = df['BB_Middle'] + (bb_std * 2)
-    df['BB_Lower'] = df['BB_Middle'] - (bb_std * 2)
-    df['BB_Width'] = df['BB_Upper'] - df['BB_Lower']
-    df['BB_Position'] = (df['Close'] - df['BB_Lower']) / (df['BB_Upper'] - df['BB_Lower'])
-    
-    # Price change features
-    df['Price_Change'] = df['Close'].diff()
-    df['Price_Change_Pct'] = df['Close'].pct_change() * 100
-    df['High_Low_Pct'] = ((df['High'] - df['Low']) / df['Close']) * 100
-    df['Open_Close_Pct'] = ((df['Close'] - df['Open']) / df['Open']) * 100
-    
-    # Volume features
-    df['Volume_SMA'] = df['Volume'].rolling(window=20).mean()
-    df['Volume_Ratio'] = df['Volume'] / df['Volume_SMA']
-    
-    # Volatility
-    df['Volatility'] = df['Close'].rolling(window=20).std()
-    
-    # Price position within day's range
-    df['Price_Position'] = (df['Close'] - df['Low']) / (df['High'] - df['Low'])
+    for column in windows:
+        registry[column] = rolling(column)
+    
+    registry.update({
+        # Exponential Moving Averages
+        'EMA_12': (('Close',), lambda close: ewm(close, 12, 'EMA_12')),
+        'EMA_26': (('Close',), lambda close: ewm(close, 26, 'EMA_26')),
+        
+        # MACD
+        'MACD': (('EMA_12', 'EMA_26'), lambda ema_12, ema_26: ema_12 - ema_26),
+        'MACD_Signal': (('MACD',), lambda macd: ewm(macd, 9, 'MACD_Signal')),
+        'MACD_Histogram': (('MACD', 'MACD_Signal'), lambda macd, signal: macd - signal),
+        
+        # RSI
+        'RSI': ((RSI_GAIN, RSI_LOSS), lambda gain, loss: 100 - (100 / (1 + gain / loss))),
+        
+        # Bollinger Bands
+        'BB_Middle': rolling('BB_Middle'),
+        'BB_Upper': (('BB_Middle', BB_STD), lambda middle, std: middle + (std * 2)),
+        'BB_Lower': (('BB_Middle', BB_STD), lambda middle, std: middle - (std * 2)),
+        'BB_Width': (('BB_Upper', 'BB_Lower'), lambda upper, lower: upper - lower),
+        'BB_Position': (
+            ('Close', 'BB_Upper', 'BB_Lower'),
+            lambda close, upper, lower: (close - lower) / (upper - lower)
+        ),
+        
+        # Price change features
+        'Price_Change': (('Delta',), lambda delta: delta),
+        'Price_Change_Pct': (('Close',), lambda close: pd.Series(close).pct_change().to_numpy() * 100),
+        'High_Low_Pct': (('High', 'Low', 'Close'), lambda high, low, close: ((high - low) / close) * 100),
+        'Open_Close_Pct': (('Open', 'Close'), lambda open_price, close: ((close - open_price) / open_price) * 100),
+        
+        # Volume features
+        'Volume_SMA': rolling('Volume_SMA'),
+        'Volume_Ratio': (('Volume', 'Volume_SMA'), lambda volume, sma: volume / sma),
+        
+        # Volatility
+        'Volatility': rolling('Volatility'),
+        
+        # Price position within day's range
+        'Price_Position': (('Close', 'High', 'Low'), lambda close, high, low: (close - low) / (high - low))
+    })
     
     # Lag features
     for lag in [1, 2, 3, 5, 7]:
-        df[f'Close_Lag_{lag}'] = df['Close'].shift(lag)
-        df[f'Volume_Lag_{lag}'] = df['Volume'].shift(lag)
+        registry[f'Close_Lag_{lag}'] = (('Close',), lambda close, lag=lag: _lag(close, lag))
+        registry[f'Volume_Lag_{lag}'] = (('Volume',), lambda volume, lag=lag: _lag(volume, lag))
     
     # Rolling statistics
     for window in [5, 10, 20]:
-        df[f'Close_Rolling_Mean_{window}'] = df['Close'].rolling(window=window).mean()
-        df[f'Close_Rolling_Std_{window}'] = df['Close'].rolling(window=window).std()
-        df[f'Volume_Rolling_Mean_{window}'] = df['Volume'].rolling(window=window).mean()
+        for column in [f'Close_Rolling_Mean_{window}', f'Close_Rolling_Std_{window}', f'Volume_Rolling_Mean_{window}']:
+            registry[column] = rolling(column)
+    
+    return registry
+
+def _output_columns(registry):
+    """Registry names that become DataFrame columns, in order"""
+    return [name for name in registry if isinstance(name, str) and name not in INTERMEDIATES]
+
+def _resolve_features(registry, names):
+    """Dependency closure of the requested names, dependencies first"""
+    order = []
+    seen = set()
+    
+    def visit(name):
+        # Anything outside the registry is a raw input column
+        if name in seen or name not in registry:
+            return
+        seen.add(name)
+        for dependency in registry[name][0]:
+            visit(dependency)
+        order.append(name)
+    
+    for name in names:
+        visit(name)
+    
+    return order
+
+def _evaluate_features(registry, inputs, names):
+    """Compute the requested names and only what they depend on, each node once"""
+    values = dict(inputs)
+    order = _resolve_features(registry, names)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name in order:
+            if name in values:
+                continue
+            
+            dependencies, builder = registry[name]
+            if builder is None:
+                # Batch every pending rolling key whose source is ready into one sweep per source
+                pending = {
+                    key for key in order
+                    if registry[key][1] is None and key not in values and key[0] in values
+                }
+                values.update(_compute_rolling(values, pending))
+            else:
+                values[name] = builder(*[values[dependency] for dependency in dependencies])
+    
+    return values
+
+def _indicator_arrays(df, windows, columns=None, ewm_state=None):
+    """Indicator columns (all of them, or just columns) as a dict of float64 arrays
+    
+    ewm_state maps each EWM column to (last_value, n_obs) of the history that
+    precedes the first row flagged in ewm_state['new_rows'].
+    """
+    def ewm(values, span, column):
+        if ewm_state is None:
+            return pd.Series(values).ewm(span=span).mean().to_numpy()
+        
+        # History rows keep their stored values, only the new tail is stepped forward
+        result = ewm_state['history'][column].copy()
+        start = ewm_state['new_rows']
+        last_value, n_obs = ewm_state[column]
+        result[start:] = _ewm_continue(values[start:], span, last_value, n_obs)
+        return result
+    
+    registry = _feature_registry(windows, ewm)
+    outputs = _output_columns(registry)
+    if columns is not None:
+        outputs = [name for name in outputs if name in set(columns)]
+    
+    inputs = {column: df[column].to_numpy(dtype=float) for column in RAW_INPUTS}
+    values = _evaluate_features(registry, inputs, outputs)
     
-    return df
+    return {name: values[name] for name in outputs}
 
-def preprocess_data(df):
-    """Preprocess data for machine learning"""
-    df = df.copy()
+def calculate_technical_indicators(df, columns=None):
+    """Calculate technical indicators for the dataset
+    
+    Args:
+        df: OHLCV data
+        columns: Indicator columns to compute, e.g. a trained model's feature
+            names; only these and what they depend on are calculated. All
+            indicators when None.
+    """
+    # Determine window sizes based on available data
+    indicators = pd.DataFrame(_indicator_arrays(df, _indicator_windows(len(df)), columns), index=df.index)
+    
+    return pd.concat([df.drop(columns=indicators.columns, errors='ignore'), indicators], axis=1)
+
+def _raw_columns(df, indicators):
+    """Numeric input columns kept as they are (float64), Close first"""
+    arrays = {'Close': df['Close'].to_numpy(dtype=float)}
+    for column in df.columns:
+        if column not in arrays and column not in indicators and pd.api.types.is_numeric_dtype(df[column]):
+            arrays[column] = df[column].to_numpy(dtype=float)
+    
+    return arrays
+
+def warn_dropped_columns(df):
+    """Warn about the input columns preprocess_data leaves out (non-numeric ones other than Date)"""
+    dropped = [column for column in df.columns if column != 'Date' and not pd.api.types.is_numeric_dtype(df[column])]
+    if dropped:
+        st.warning(f"⚠️ Non-numeric columns are not used and were dropped: {', '.join(map(str, dropped))}")
+
+def _with_ewm_state(processed_df, indicators, n_obs):
+    """Attach the exact float64 EWM values the next incremental update continues from"""
+    processed_df.attrs['ewm_state'] = {
+        'n_obs': n_obs,
+        'last_date': processed_df['Date'].iloc[-1] if len(processed_df) else None,
+        **{column: float(indicators[column][-1]) for column in EWM_COLUMNS if column in indicators}
+    }
+    
+    return processed_df
+
+def _stored_ewm_state(processed_df):
+    """Exact EWM values attrs['ewm_state'] holds for processed_df's last row; {} when they are not for it"""
+    state = processed_df.attrs.get('ewm_state', {})
+    if (not len(processed_df) or state.get('n_obs') != len(processed_df)
+            or state.get('last_date') != processed_df['Date'].iloc[-1]):
+        return {}
+    
+    return {column: state[column] for column in EWM_COLUMNS if column in state}
+
+def preprocess_data(df, columns=None, dtype=np.float32):
+    """Preprocess data for machine learning (all indicators, or just columns)
+    
+    The result is a DataFrame view over a FeatureStore: the numeric input
+    columns (Close, Volume, ...) stay float64, while the derived indicators
+    share one contiguous array of dtype (float32 unless float64 is asked for),
+    so training and prediction can take them without copying. Non-numeric
+    columns other than Date are dropped, with a warning, and the rows that are
+    kept are renumbered from 0.
+    """
+    warn_dropped_columns(df)
     
     # Calculate technical indicators
-    df = calculate_technical_indicators(df)
+    indicators = _indicator_arrays(df, _indicator_windows(len(df)), columns)
+    store = FeatureStore.from_arrays(indicators, df['Date'].to_numpy(), dtype, _raw_columns(df, indicators))
     
     # Handle missing values
-    numeric_columns = df.select_dtypes(include=[np.number]).columns
-    
-    # Forward fill first, then backward fill for any remaining NaNs
-    df[numeric_columns] = df[numeric_columns].fillna(method='ffill').fillna(method='bfill')
+    store.fill_missing()
     
     # Remove any remaining rows with NaN values
-    df = df.dropna()
+    store = store.drop_incomplete_rows()
+    
+    return _with_ewm_state(store.to_frame(), indicators, len(df))
+
+def preprocess_new_rows(processed_df, df):
+    """Extend processed data with the rows appended to df since it was processed
     
-    return df
+    Only the new tail rows are computed: rolling windows are rebuilt from the last
+    INDICATOR_LOOKBACK raw rows and the EMAs continue from their stored state, so
+    the result is identical to running preprocess_data on the whole of df. Falls
+    back to a full preprocess_data when the history cannot be continued safely.
+    """
+    n_history = len(processed_df)
+    n_new = len(df) - n_history
+    
+    if n_new <= 0:
+        return processed_df
+    
+    store = FeatureStore.from_frame(processed_df)
+    
+    # Continue the same indicator columns the processed data already has
+    windows = _indicator_windows(len(df))
+    registry = _feature_registry(windows)
+    columns = [column for column in store.columns if column in _output_columns(registry)]
+    ewm_columns = [column for column in EWM_COLUMNS if column in _resolve_features(registry, columns)]
+    
+    # Exact EWM values are kept in attrs; float32 columns are only rounded copies
+    ewm_state = _stored_ewm_state(processed_df)
+    if store.dtype == np.float64:
+        ewm_state = {**{column: store.column(column)[-1] for column in ewm_columns if column in store.index}, **ewm_state}
+    
+    # The SMA windows depend on the row count until there are 150+ rows
+    can_continue = (
+        n_history >= 3 * INDICATOR_LOOKBACK
+        and _indicator_windows(n_history) == windows
+        and processed_df['Date'].iloc[-1] == df['Date'].iloc[n_history - 1]
+        and not df['Close'].isna().any()
+        and all(column in ewm_state for column in ewm_columns)
+    )
+    if not can_continue:
+        return preprocess_data(df, columns, store.dtype)
+    
+    start = n_history - INDICATOR_LOOKBACK
+    tail_state = {'new_rows': INDICATOR_LOOKBACK, 'history': {}}
+    for column in ewm_columns:
+        # Only the new rows are read back out of the EWM columns
+        tail_state['history'][column] = np.full(len(df) - start, np.nan)
+        tail_state[column] = (ewm_state[column], n_history)
+    
+    tail = _indicator_arrays(df.iloc[start:], windows, columns, tail_state)
+    tail = {column: values[INDICATOR_LOOKBACK:] for column, values in tail.items()}
+    new_rows = df.iloc[n_history:]
+    
+    # Old rows are copied once into the grown store, new rows are written straight in
+    values = np.empty((len(df), len(store.columns)), dtype=store.dtype, order='F')
+    values[:n_history] = store.values
+    for i, column in enumerate(store.columns):
+        values[n_history:, i] = tail[column] if column in tail else new_rows[column].to_numpy()
+    
+    raw = np.empty((len(df), len(store.raw_columns)), order='F')
+    raw[:n_history] = store.raw
+    for i, column in enumerate(store.raw_columns):
+        raw[n_history:, i] = new_rows[column].to_numpy(dtype=float)
+    
+    # Forward fill from the last processed row, exactly like the batch fill
+    dates = np.concatenate([store.dates, new_rows['Date'].to_numpy()])
+    result = FeatureStore(values, store.columns, dates, raw, store.raw_columns).fill_missing(start=n_history - 1)
+    result = result.drop_incomplete_rows(start=n_history)
+    
+    return _with_ewm_state(result.to_frame(), tail, len(df))
 
-def create_features_target(df, target_column='Close', forecast_days=1):
-    """Create feature matrix and target variable for ML models"""
+def create_features_target(df, target_column='Close', forecast_days=1, feature_columns=None):
+    """Create feature matrix and target variable for ML models
+    
+    Args:
+        forecast_days: Days ahead to predict, or a list of horizons (e.g.
+            [1, 3, 7, 14, 30]) for a 2-D target with one column per horizon.
+            Only rows where every horizon has a known target are kept.
+        feature_columns: Columns to use as features, in order (e.g. a trained
+            model's feature names). Defaults to every column except Date and target.
+    """
     # Check minimum data requirements
     if len(df) < 50:
         st.warning(f"⚠️ Warning: Only {len(df)} rows of data. Recommended minimum: 100 rows for reliable training.")
     
     # Feature columns (excluding date and target)
-    feature_columns = [col for col in df.columns if col not in ['Date', target_column]]
+    if feature_columns is None:
+        feature_columns = [col for col in df.columns if col not in ['Date', target_column]]
+    
+    # Create features (a view of the feature store when the columns are adjacent); raw float64
+    # columns mixed in with float32 indicators come out as one float32 copy, not a float64 one
+    dtypes = [df[column].dtype for column in feature_columns]
+    X = frame_matrix(df, feature_columns, min(dtypes, key=lambda dtype: dtype.itemsize) if dtypes else None)
+    target = df[target_column].to_numpy()
     
-    # Create features
-    X = df[feature_columns].values
+    if np.ndim(forecast_days) == 0:
+        # Create target (next day's closing price)
+        y = target[forecast_days:]
+        max_horizon = forecast_days
+    else:
+        # Every horizon in one pass: row i of the window view holds target[i:i + max_horizon + 1]
+        horizons = np.asarray(forecast_days)
+        max_horizon = int(horizons.max())
+        if len(target) > max_horizon:
+            y = sliding_window_view(target, max_horizon + 1)[:, horizons]
+        else:
+            y = np.empty((0, len(horizons)), dtype=target.dtype)
     
-    # Create target (next day's closing price)
-    y = df[target_column].shift(-forecast_days).values
+    # Drop the last rows, which have no target yet
+    X = X[:max(len(X) - max_horizon, 0)]
     
-    # Remove last rows where target is NaN
-    valid_indices = ~np.isnan(y)
-    X = X[valid_indices]
-    y = y[valid_indices]
+    # Remove rows where target is NaN
+    missing = np.isnan(y) if y.ndim == 1 else np.isnan(y).any(axis=1)
+    if missing.any():
+        valid_indices = ~missing
+        X = X[valid_indices]
+        y = y[valid_indices]
     
     # Final check for empty data
     if len(X) == 0:
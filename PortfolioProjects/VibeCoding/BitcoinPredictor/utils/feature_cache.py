@@ -0,0 +1,143 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from utils import data_preprocessing, feature_store
+from utils.data_preprocessing import preprocess_data
+from utils.feature_store import FeatureStore
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'features')
+
+# Disk space the cache may use; the least recently used entries are deleted after a save beyond it
+FEATURE_CACHE_MB = int(os.environ.get('FEATURE_CACHE_MB', 2048))
+
+def _definitions_hash():
+    """Hash of the code that defines the indicators and the store layout"""
+    digest = hashlib.sha256()
+    for module in (data_preprocessing, feature_store):
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    
+    return digest.hexdigest()
+
+def cache_key(df, columns=None, dtype=np.float32):
+    """Content hash of the raw data plus everything that shapes its processed form
+    
+    Changes to the data, the requested columns, the dtype or the indicator code
+    all give a new key, so stale entries are never read back.
+    """
+    digest = hashlib.sha256()
+    digest.update(_definitions_hash().encode())
+    digest.update(repr((list(df.columns), [str(t) for t in df.dtypes], sorted(columns) if columns is not None else None,
+                        np.dtype(dtype).str)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    
+    return digest.hexdigest()
+
+def _ewm_metadata(processed_df):
+    """JSON-safe copy of the exact EWM state preprocess_new_rows continues from"""
+    state = dict(processed_df.attrs.get('ewm_state', {}))
+    if state.get('last_date') is not None:
+        state['last_date'] = pd.Timestamp(state['last_date']).isoformat()
+    
+    return {'ewm_state': state}
+
+def _restore_attrs(processed_df, metadata):
+    """Put the saved EWM state back on a loaded DataFrame"""
+    state = dict(metadata.get('ewm_state', {}))
+    if state.get('last_date') is not None:
+        state['last_date'] = pd.Timestamp(state['last_date'])
+    processed_df.attrs['ewm_state'] = state
+    
+    return processed_df
+
+def load_cached(key, cache_dir=CACHE_DIR):
+    """Processed DataFrame for key, memory-mapped read-only from disk; None if not cached"""
+    directory = os.path.join(cache_dir, key)
+    if not os.path.exists(os.path.join(directory, 'schema.json')):
+        return None
+    
+    store, metadata = FeatureStore.load(directory)
+    
+    # Marks the entry as recently used for evict_cache
+    try:
+        os.utime(os.path.join(directory, 'schema.json'))
+    except OSError:
+        pass
+    
+    return _restore_attrs(store.to_frame(), metadata)
+
+def _save_cached(key, processed_df, cache_dir):
+    """Write an entry atomically: build it in a temporary directory, then rename"""
+    os.makedirs(cache_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f'.{key}-', dir=cache_dir)
+    
+    try:
+        FeatureStore.from_frame(processed_df).save(staging, _ewm_metadata(processed_df))
+        os.replace(staging, os.path.join(cache_dir, key))
+    except OSError:
+        # Another session wrote the same entry first
+        shutil.rmtree(staging, ignore_errors=True)
+
+def _entry_size(directory):
+    return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+def evict_cache(max_mb=FEATURE_CACHE_MB, cache_dir=CACHE_DIR, keep=None):
+    """Delete the least recently used entries until the cache fits in max_mb
+    
+    The entry named keep (the one just saved) is never deleted. Sessions that
+    memory-mapped a deleted entry keep reading it; the files go once unmapped.
+    """
+    entries = []
+    for entry in os.scandir(cache_dir):
+        schema = os.path.join(entry.path, 'schema.json')
+        # Skips staging directories and entries still being written
+        if entry.name.startswith('.') or not os.path.exists(schema):
+            continue
+        try:
+            entries.append((os.path.getmtime(schema), entry.name, _entry_size(entry.path)))
+        except OSError:
+            continue
+    
+    total = sum(size for _, _, size in entries)
+    for _, name, size in sorted(entries):
+        if total <= max_mb * 1024 * 1024:
+            break
+        if name == keep:
+            continue
+        
+        shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+        total -= size
+
+def cached_preprocess_data(df, columns=None, dtype=np.float32, cache_dir=CACHE_DIR):
+    """preprocess_data backed by the on-disk cache
+    
+    The first call for some data writes the processed matrix and Date index as
+    .npy files plus a JSON schema under cache_dir; later calls, from any session
+    or process, memory-map them instead of recomputing. The cache is kept
+    under FEATURE_CACHE_MB by evicting the least recently used entries.
+    """
+    # Object-dtype dates cannot be memory-mapped, so those frames skip the cache
+    if not pd.api.types.is_datetime64_dtype(df['Date']):
+        return preprocess_data(df, columns, dtype)
+    
+    key = cache_key(df, columns, dtype)
+    processed_df = load_cached(key, cache_dir)
+    if processed_df is not None:
+        data_preprocessing.warn_dropped_columns(df)
+        return processed_df
+    
+    processed_df = preprocess_data(df, columns, dtype)
+    try:
+        _save_cached(key, processed_df, cache_dir)
+        evict_cache(cache_dir=cache_dir, keep=key)
+    except OSError:
+        # A read-only or full disk only costs the cache, not the result
+        return processed_df
+    
+    # Hand back the memory-mapped copy so the session does not hold both
+    cached_df = load_cached(key, cache_dir)
+    
+    return cached_df if cached_df is not None else processed_df
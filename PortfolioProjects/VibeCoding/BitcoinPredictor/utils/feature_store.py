@@ -0,0 +1,196 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+class FeatureStore:
+    """Processed data held in column-major 2-D arrays
+    
+    The derived features share one contiguous array (values) of the store's
+    dtype. Each of them is a contiguous slice of it and any run of adjacent
+    ones (e.g. every model feature) is a zero-copy view, which is also what
+    backs the DataFrame returned by to_frame(). Raw input columns (Close,
+    Volume, ...) are kept exactly, in a separate float64 array (raw).
+    """
+    def __init__(self, values, columns, dates, raw=None, raw_columns=()):
+        self.values = values
+        self.columns = list(columns)
+        self.index = {column: i for i, column in enumerate(self.columns)}
+        self.raw = raw if raw is not None else np.empty((len(dates), 0), order='F')
+        self.raw_columns = list(raw_columns)
+        self.raw_index = {column: i for i, column in enumerate(self.raw_columns)}
+        self.dates = dates
+    
+    @classmethod
+    def from_arrays(cls, arrays, dates, dtype=np.float32, raw_arrays=None):
+        """Copy dicts of equal-length 1-D arrays, in column order, into a new store
+        
+        arrays become the derived columns (of dtype), raw_arrays the float64 raw ones.
+        """
+        raw_arrays = raw_arrays or {}
+        
+        return cls(_column_major(arrays, len(dates), dtype), arrays.keys(), np.asarray(dates),
+                   _column_major(raw_arrays, len(dates), np.float64), raw_arrays.keys())
+    
+    @classmethod
+    def from_frame(cls, df, raw_columns=None):
+        """Store the non-Date columns of df, a read-only view when df came from to_frame
+        
+        raw_columns default to the ones to_frame recorded in df.attrs.
+        """
+        raw_columns = df.attrs.get('raw_columns', []) if raw_columns is None else raw_columns
+        columns = [column for column in df.columns if column != 'Date' and column not in raw_columns]
+        values = np.asfortranarray(frame_matrix(df, columns))
+        raw = np.asfortranarray(frame_matrix(df, raw_columns, np.float64)) if raw_columns else None
+        
+        return cls(values, columns, df['Date'].to_numpy(), raw, raw_columns)
+    
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        """Open a store written by save, memory-mapping its arrays (zero-copy)
+        
+        Returns the store and the extra metadata saved with it.
+        """
+        with open(os.path.join(directory, 'schema.json')) as f:
+            schema = json.load(f)
+        
+        values = np.load(os.path.join(directory, 'values.npy'), mmap_mode=mmap_mode)
+        dates = np.load(os.path.join(directory, 'dates.npy'), mmap_mode=mmap_mode)
+        raw = None
+        if schema.get('raw_columns'):
+            raw = np.load(os.path.join(directory, 'raw.npy'), mmap_mode=mmap_mode)
+        
+        return cls(values, schema['columns'], dates, raw, schema.get('raw_columns', [])), schema.get('metadata', {})
+    
+    def save(self, directory, metadata=None):
+        """Write the store as .npy arrays plus a JSON schema
+        
+        Args:
+            directory: Created if missing; existing files are overwritten
+            metadata: Extra JSON-serialisable values returned again by load
+        """
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, 'values.npy'), self.values)
+        np.save(os.path.join(directory, 'dates.npy'), self.dates, allow_pickle=False)
+        if self.raw_columns:
+            np.save(os.path.join(directory, 'raw.npy'), self.raw)
+        
+        schema = {
+            'columns': self.columns,
+            'raw_columns': self.raw_columns,
+            'dtype': self.dtype.str,
+            'rows': len(self),
+            'metadata': metadata or {}
+        }
+        with open(os.path.join(directory, 'schema.json'), 'w') as f:
+            json.dump(schema, f, indent=2)
+    
+    def __len__(self):
+        return self.values.shape[0]
+    
+    @property
+    def dtype(self):
+        return self.values.dtype
+    
+    def column(self, name):
+        """Zero-copy view of one column"""
+        if name in self.raw_index:
+            return self.raw[:, self.raw_index[name]]
+        
+        return self.values[:, self.index[name]]
+    
+    def matrix(self, columns):
+        """2-D array of derived columns, a zero-copy view when they are adjacent in the store"""
+        positions = [self.index[column] for column in columns]
+        start = positions[0] if positions else 0
+        
+        if positions == list(range(start, start + len(positions))):
+            return self.values[:, start:start + len(positions)]
+        
+        return self.values[:, positions]
+    
+    def fill_missing(self, start=0):
+        """Forward fill, then backward fill, NaNs in place from row start onwards"""
+        rows = np.arange(len(self) - start)
+        
+        for block in (self.raw, self.values):
+            for i in range(block.shape[1]):
+                column = block[start:, i]
+                missing = np.isnan(column)
+                if not missing.any():
+                    continue
+                
+                # Index of the last valid row at or before each row
+                last_valid = np.where(missing, 0, rows)
+                np.maximum.accumulate(last_valid, out=last_valid)
+                column[:] = column[last_valid]
+                
+                # Only leading NaNs are left; fill them from the first valid value
+                valid = ~np.isnan(column)
+                if valid.any():
+                    first = np.argmax(valid)
+                    column[:first] = column[first]
+        
+        return self
+    
+    def drop_incomplete_rows(self, start=0):
+        """Store without the rows from start onwards that still contain NaNs"""
+        keep = ~(np.isnan(self.values[start:]).any(axis=1) | np.isnan(self.raw[start:]).any(axis=1))
+        if keep.all():
+            return self
+        
+        keep = np.concatenate([np.ones(start, dtype=bool), keep])
+        return FeatureStore(np.asfortranarray(self.values[keep]), self.columns, self.dates[keep],
+                            np.asfortranarray(self.raw[keep]), self.raw_columns)
+    
+    def to_frame(self):
+        """DataFrame of Date, the raw columns and every derived column, sharing memory with the store
+        
+        The raw column names are recorded in attrs['raw_columns'] for from_frame.
+        """
+        frame = pd.DataFrame(self.values, columns=self.columns, copy=False)
+        frame.insert(0, 'Date', self.dates)
+        for i, column in enumerate(self.raw_columns):
+            frame.insert(i + 1, column, self.raw[:, i])
+        frame.attrs['raw_columns'] = list(self.raw_columns)
+        
+        return frame
+
+def _column_major(arrays, n_rows, dtype):
+    """(n_rows, len(arrays)) Fortran-ordered array of dtype holding arrays as its columns"""
+    values = np.empty((n_rows, len(arrays)), dtype=dtype, order='F')
+    for i, array in enumerate(arrays.values()):
+        values[:, i] = array
+    
+    return values
+
+def _buffer_owner(array):
+    """The array that owns the memory array is a view of"""
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    
+    return array
+
+def frame_matrix(df, columns, dtype=None):
+    """Values of columns as a 2-D array, without copying when they are adjacent
+    
+    On a DataFrame built by FeatureStore.to_frame the derived columns are
+    back-to-back slices of the store, so the result is a read-only view of it.
+    pandas copies when slicing several columns of a mixed-dtype frame, hence
+    the stride check. Anything else is copied, as dtype when given.
+    """
+    arrays = [df[column].to_numpy() for column in columns]
+    
+    if (arrays and len(arrays[0]) and dtype in (None, arrays[0].dtype)
+            and all(array.dtype == arrays[0].dtype and array.flags.c_contiguous for array in arrays)):
+        first = arrays[0]
+        step = first.nbytes
+        addresses = [array.__array_interface__['data'][0] for array in arrays]
+        owner = _buffer_owner(first)
+        
+        if (addresses == [addresses[0] + i * step for i in range(len(arrays))]
+                and all(_buffer_owner(array) is owner for array in arrays)):
+            return np.lib.stride_tricks.as_strided(first, shape=(len(first), len(arrays)),
+                                                   strides=(first.itemsize, step), writeable=False)
+    
+    return df[columns].to_numpy(dtype=dtype)
@@ -0,0 +1,118 @@
+import numpy as np
+from utils.data_preprocessing import (
+    INDICATOR_LOOKBACK, EWM_COLUMNS, RAW_INPUTS, _evaluate_features, _ewm_continue, _feature_registry,
+    _indicator_arrays, _indicator_windows, _output_columns, _resolve_features, _stored_ewm_state
+)
+from utils.feature_store import frame_matrix
+
+class FeatureRollforward:
+    """Feature rows for days beyond the processed data, built from predicted closes
+    
+    Each advance() appends one synthetic OHLCV bar and recomputes only the model's
+    features for that bar: rolling windows over the last INDICATOR_LOOKBACK bars,
+    EMAs stepped forward from their previous value, lags read off the tail. The
+    cost per step does not grow with the history or the horizon.
+    
+    The synthetic bar opens at the previous close, spans the recent average
+    daily range and carries the recent average volume. Other input columns
+    (e.g. a Market Cap column) keep their last value.
+    """
+    def __init__(self, processed_df, feature_names, history_rows=1):
+        self.feature_names = list(feature_names)
+        self.windows = _indicator_windows(len(processed_df))
+        self.rows = frame_matrix(processed_df.iloc[-history_rows:], self.feature_names).astype(float)
+        
+        # Only the indicators the model uses (and what they depend on) are evaluated
+        registry = _feature_registry(self.windows)
+        self.indicators = [name for name in _output_columns(registry) if name in set(self.feature_names)]
+        tail = processed_df.iloc[-INDICATOR_LOOKBACK:]
+        self.tail = {column: tail[column].to_numpy(dtype=float) for column in RAW_INPUTS}
+        
+        # Exact EWM state of the history, stepped forward one value per day from here; it comes from
+        # the processed data's attrs, and only without them is the EWM recomputed over the full history
+        ewm_columns = [column for column in EWM_COLUMNS if column in _resolve_features(registry, self.indicators)]
+        ewm_values = _stored_ewm_state(processed_df)
+        missing = [column for column in ewm_columns if column not in ewm_values]
+        if missing:
+            ewm_values.update({column: values[-1] for column, values in _indicator_arrays(processed_df, self.windows, missing).items()})
+        self.ewm_state = {column: (ewm_values[column], len(processed_df)) for column in ewm_columns}
+        
+        # Recent averages the synthetic bars are shaped by
+        recent = processed_df.iloc[-20:]
+        self.range_pct = float(((recent['High'] - recent['Low']) / recent['Close']).mean())
+        self.volume = float(recent['Volume'].mean())
+    
+    def current(self):
+        """Feature rows the next prediction is made from (the last history_rows days)"""
+        return self.rows
+    
+    def _next_bar(self, close):
+        """Synthetic OHLCV bar for a predicted close"""
+        open_price = self.tail['Close'][-1]
+        excess = max(self.range_pct * close - abs(close - open_price), 0.) / 2
+        
+        return {
+            'Open': open_price,
+            'High': max(open_price, close) + excess,
+            'Low': min(open_price, close) - excess,
+            'Close': close,
+            'Adj Close': close,
+            'Volume': self.volume
+        }
+    
+    def advance(self, close):
+        """Append the bar for a predicted close and return the updated feature rows"""
+        bar = self._next_bar(close)
+        inputs = {column: np.append(self.tail[column], bar[column]) for column in RAW_INPUTS}
+        stepped = {}
+        
+        def ewm(values, span, column):
+            # Only the new bar's value is needed; earlier positions are never read
+            last_value, n_obs = self.ewm_state[column]
+            result = np.full(len(values), np.nan)
+            result[-1] = _ewm_continue(values[-1:], span, last_value, n_obs)[0]
+            stepped[column] = result[-1]
+            return result
+        
+        values = _evaluate_features(_feature_registry(self.windows, ewm), inputs, self.indicators)
+        
+        for column, value in stepped.items():
+            self.ewm_state[column] = (value, self.ewm_state[column][1] + 1)
+        self.tail = {column: array[1:] for column, array in inputs.items()}
+        
+        row = np.array([
+            bar[name] if name in bar else values[name][-1] if name in values else self.rows[-1][i]
+            for i, name in enumerate(self.feature_names)
+        ])
+        
+        # Undefined values (e.g. RSI after a flat stretch) carry forward, like the batch fill
+        missing = ~np.isfinite(row)
+        row[missing] = self.rows[-1][missing]
+        
+        self.rows = np.vstack([self.rows[1:], row])
+        
+        return self.rows
+
+def recursive_forecast(trainer, model_name, processed_df, feature_names, days):
+    """Forecast days closes by feeding each prediction back in as the next day's close
+    
+    Returns the forecast as an array, shorter than days if the model stops
+    producing predictions.
+    """
+    history_rows = 1
+    if model_name == 'LSTM' and 'LSTM' in trainer.scalers:
+        history_rows = trainer.scalers['LSTM']['sequence_length']
+    
+    rollforward = FeatureRollforward(processed_df, feature_names, history_rows)
+    features = rollforward.current()
+    forecast = []
+    
+    for _ in range(days):
+        pred = trainer.predict(model_name, features)
+        if pred is None or len(pred) == 0:
+            break
+        
+        forecast.append(float(pred[-1]))
+        features = rollforward.advance(forecast[-1])
+    
+    return np.array(forecast)
@@ -0,0 +1,103 @@
+import os
+import re
+import threading
+import pandas as pd
+from utils.columnar_io import read_columnar, write_columnar
+
+# v2: bars are labelled by the UTC day they cover and carry real High/Low
+HISTORY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'history', 'v2')
+
+# Column order of stored bars
+HISTORY_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+# One writer at a time per server process; readers never see a half-written partition
+_write_lock = threading.Lock()
+
+def utc_today():
+    """Midnight of the current UTC day, as a naive timestamp like the stored Dates"""
+    return pd.Timestamp.now(tz='UTC').tz_localize(None).normalize()
+
+def _asset_dir(asset, history_dir):
+    return os.path.join(history_dir, re.sub(r'[^a-z0-9]+', '_', asset.lower()))
+
+def _partition_path(asset, year, history_dir):
+    return os.path.join(_asset_dir(asset, history_dir), f'{year}.parquet')
+
+def _stored_years(asset, history_dir):
+    directory = _asset_dir(asset, history_dir)
+    if not os.path.isdir(directory):
+        return []
+    
+    return sorted(int(name[:4]) for name in os.listdir(directory) if re.fullmatch(r'\d{4}\.parquet', name))
+
+def load_history(asset='bitcoin', start_date=None, end_date=None, columns=None, history_dir=HISTORY_DIR):
+    """Stored daily bars of asset in an inclusive Date range, read from disk
+    
+    Only the yearly partitions overlapping the range are opened, and the range
+    is pushed down into each Parquet read.
+    """
+    years = _stored_years(asset, history_dir)
+    if start_date is not None:
+        years = [year for year in years if year >= pd.Timestamp(start_date).year]
+    if end_date is not None:
+        years = [year for year in years if year <= pd.Timestamp(end_date).year]
+    
+    frames = [
+        read_columnar(_partition_path(asset, year, history_dir), 'parquet', columns, start_date, end_date)
+        for year in years
+    ]
+    if not frames:
+        return pd.DataFrame({column: pd.Series(dtype='datetime64[ns]' if column == 'Date' else float)
+                             for column in columns or HISTORY_COLUMNS})
+    
+    return pd.concat(frames, ignore_index=True).sort_values('Date').reset_index(drop=True)
+
+def store_history(df, asset='bitcoin', history_dir=HISTORY_DIR):
+    """Append the closed days of df that are not stored yet; returns the number of rows added
+    
+    Dates are normalized to midnight. Today's (UTC) bar is still forming, so it is
+    never stored. Stored days are never rewritten.
+    """
+    today = utc_today()
+    rows = df[HISTORY_COLUMNS].assign(Date=pd.to_datetime(df['Date']).dt.normalize().astype('datetime64[ns]'))
+    rows = rows[rows['Date'] < today].drop_duplicates('Date', keep='last')
+    added = 0
+    
+    with _write_lock:
+        for year, year_rows in rows.groupby(rows['Date'].dt.year):
+            path = _partition_path(asset, year, history_dir)
+            existing = read_columnar(path, 'parquet') if os.path.exists(path) else None
+            if existing is not None:
+                year_rows = year_rows[~year_rows['Date'].isin(existing['Date'])]
+            if len(year_rows) == 0:
+                continue
+            
+            added += len(year_rows)
+            if existing is not None:
+                year_rows = pd.concat([existing, year_rows], ignore_index=True)
+            
+            # Partitions are small (a year of bars), so appending rewrites one under a temporary name
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            staging = f'{path}.tmp-{os.getpid()}'
+            write_columnar(year_rows.sort_values('Date').reset_index(drop=True), staging, 'parquet')
+            os.replace(staging, path)
+    
+    return added
+
+def missing_ranges(asset, start_date, end_date, history_dir=HISTORY_DIR):
+    """Inclusive (start, end) Date ranges between start_date and end_date that are not stored"""
+    days = pd.date_range(pd.Timestamp(start_date).normalize(), pd.Timestamp(end_date).normalize(), freq='D')
+    if len(days) == 0:
+        return []
+    
+    stored = load_history(asset, days[0], days[-1], ['Date'], history_dir)
+    missing = days[~days.isin(stored['Date'])]
+    if len(missing) == 0:
+        return []
+    
+    # A new range starts wherever consecutive missing days are more than a day apart
+    breaks = (missing[1:] - missing[:-1]) > pd.Timedelta(days=1)
+    starts = [missing[0]] + list(missing[1:][breaks])
+    ends = list(missing[:-1][breaks]) + [missing[-1]]
+    
+    return list(zip(starts, ends))
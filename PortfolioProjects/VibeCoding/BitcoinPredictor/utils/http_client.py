@@ -0,0 +1,117 @@
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+# Base URL of the CoinGecko API; point it at a stub server to test without the real API
+COINGECKO_API_URL = os.environ.get('COINGECKO_API_URL', 'https://api.coingecko.com/api/v3')
+
+# CoinGecko free-tier budget shared by every session of this server process
+COINGECKO_RATE_PER_MINUTE = float(os.environ.get('COINGECKO_RATE_PER_MINUTE', 10))
+COINGECKO_BURST = int(os.environ.get('COINGECKO_BURST', 3))
+
+# Responses worth retrying: rate limited or a transient server failure
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Thread-safe token bucket: rate tokens per second, holding at most capacity"""
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.
+        self._lock = threading.Lock()
+    
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def acquire(self, timeout=None):
+        """Take one token, waiting for it up to timeout seconds (forever when None); False if it timed out"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                
+                wait = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+            
+            if deadline is not None:
+                if time.monotonic() + wait > deadline:
+                    return False
+            time.sleep(wait)
+    
+    def block(self, seconds):
+        """Hand out no tokens for the next seconds (e.g. the server's Retry-After) and drop the saved ones"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.
+
+class HttpClient:
+    """Connection-pooled JSON client with retries, backoff and a shared rate limit
+    
+    One requests.Session keeps connections alive across calls and threads.
+    Every request (retries included) takes a token from the client's bucket.
+    Rate-limited and transient failures are retried up to max_retries times
+    after an exponential backoff with full jitter, or after the server's
+    Retry-After, which also pauses the bucket so other sessions back off too.
+    """
+    def __init__(self, base_url, rate_per_minute=60, burst=5, max_retries=4, backoff_base=1.0, backoff_max=30.0,
+                 timeout=10, pool_size=10):
+        self.base_url = base_url.rstrip('/')
+        self.bucket = TokenBucket(rate_per_minute / 60, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    def _backoff(self, attempt):
+        """Full jitter: uniform between zero and the exponential cap"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+    
+    def _retry_after(self, response):
+        try:
+            return min(self.backoff_max, float(response.headers.get('Retry-After')))
+        except (TypeError, ValueError):
+            return None
+    
+    def get(self, path, params=None, timeout=None):
+        """GET base_url + path; raises the last error once the retries are used up"""
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                response = self.session.get(url, params=params, timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+            
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                response.raise_for_status()
+                return response
+            
+            delay = self._retry_after(response)
+            if delay is not None:
+                self.bucket.block(delay)
+            else:
+                time.sleep(self._backoff(attempt))
+    
+    def get_json(self, path, params=None, timeout=None):
+        return self.get(path, params, timeout).json()
+
+# The client every CoinGecko call of this server process goes through
+coingecko = HttpClient(COINGECKO_API_URL, rate_per_minute=COINGECKO_RATE_PER_MINUTE, burst=COINGECKO_BURST)
@@ -0,0 +1,111 @@
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve
+
+# Rows accumulated per step by fit()
+FIT_CHUNK_ROWS = 4096
+
+class StreamingLinearRegression:
+    """Least-squares linear regression kept as sufficient statistics
+    
+    Rows are added (partial_fit) or removed (remove) by updating XᵀX, Xᵀy and
+    the column sums, O(F²) per row, so a sliding window moves without touching
+    the rows in between. The coefficients are solved after every change, with
+    a Cholesky factorization of the standardized normal equations plus a small
+    ridge penalty (alpha), which keeps collinear features (e.g. Close and Adj
+    Close) solvable. Features are standardized internally, so no scaler is needed.
+    predict only reads the solved coefficients, so a model shared between
+    sessions is never written to by a prediction.
+    
+    Sums are taken around a fixed shift (the first rows' means) so the
+    centered statistics keep their precision when features are large and
+    nearly constant, like prices.
+    """
+    def __init__(self, alpha=1e-8):
+        self.alpha = alpha
+        self.n_samples_ = 0
+        self._shift_x = None
+        self._shift_y = 0.
+        self._sum_x = None
+        self._sum_y = 0.
+        self._xtx = None
+        self._xty = None
+        self._coef = None
+    
+    def _accumulate(self, X, y, sign):
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if X.ndim != 2 or len(X) != len(y):
+            raise ValueError("X must be 2-D with one row per target")
+        
+        if self._xtx is None:
+            self._shift_x = X.mean(axis=0)
+            self._shift_y = float(y.mean()) if len(y) else 0.
+            self._sum_x = np.zeros(X.shape[1])
+            self._xtx = np.zeros((X.shape[1], X.shape[1]))
+            self._xty = np.zeros(X.shape[1])
+        elif X.shape[1] != len(self._sum_x):
+            raise ValueError(f"Expected {len(self._sum_x)} features, got {X.shape[1]}")
+        
+        X = X - self._shift_x
+        y = y - self._shift_y
+        self.n_samples_ += sign * len(X)
+        self._sum_x += sign * X.sum(axis=0)
+        self._sum_y += sign * y.sum()
+        self._xtx += sign * (X.T @ X)
+        self._xty += sign * (X.T @ y)
+    
+    def partial_fit(self, X, y):
+        """Add rows"""
+        self._accumulate(X, y, 1)
+        self._solve()
+        return self
+    
+    def remove(self, X, y):
+        """Remove rows that were added before (e.g. the oldest rows of a sliding window)"""
+        if len(X) > self.n_samples_:
+            raise ValueError(f"Cannot remove {len(X)} rows from a model fitted on {self.n_samples_}")
+        
+        self._accumulate(X, y, -1)
+        if self.n_samples_:
+            self._solve()
+        else:
+            self._coef = None
+        return self
+    
+    def fit(self, X, y, chunksize=FIT_CHUNK_ROWS):
+        """Fit on X and y from scratch, accumulating chunksize rows at a time"""
+        self.__init__(self.alpha)
+        for start in range(0, len(X), chunksize):
+            self._accumulate(X[start:start + chunksize], y[start:start + chunksize], 1)
+        
+        self._solve()
+        return self
+    
+    def _solve(self):
+        if self.n_samples_ <= 0:
+            raise ValueError("Model has no rows")
+        
+        n = self.n_samples_
+        mean_x = self._sum_x / n
+        mean_y = self._sum_y / n
+        
+        # Centered statistics, then standardized so alpha means the same for every feature
+        sxx = self._xtx - n * np.outer(mean_x, mean_x)
+        sxy = self._xty - n * mean_x * mean_y
+        scale = np.sqrt(np.clip(np.diag(sxx), 0, None) / n)
+        scale[scale == 0] = 1.
+        
+        gram = sxx / np.outer(scale, scale)
+        gram[np.diag_indices_from(gram)] += self.alpha * n
+        coef = cho_solve(cho_factor(gram), sxy / scale) / scale
+        
+        self._coef = coef
+        self.coef_ = coef
+        self.intercept_ = self._shift_y + mean_y - (self._shift_x + mean_x) @ coef
+        self.n_features_in_ = len(coef)
+    
+    def predict(self, X):
+        if self._coef is None:
+            raise ValueError("Model has no rows")
+        
+        return np.asarray(X, dtype=float) @ self._coef + self.intercept_
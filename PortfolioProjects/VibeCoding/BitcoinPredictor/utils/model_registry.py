@@ -0,0 +1,285 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from collections import Counter
+import numpy as np
+from utils.shared_cache import shared_cache
+
+REGISTRY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'model_registry')
+
+# Versions kept per model; older ones are deleted as new ones are registered
+REGISTRY_KEEP_VERSIONS = int(os.environ.get('REGISTRY_KEEP_VERSIONS', 5))
+
+# (model directory, version) of warm-loaded entries some session has not read yet; pruning spares them
+_pending_versions = Counter()
+_pending_lock = threading.Lock()
+
+# Native on-disk format (and file name) of each model
+MODEL_FORMATS = {
+    'Linear Regression': ('joblib', 'model.joblib'),
+    'Random Forest': ('joblib', 'model.joblib'),
+    'XGBoost': ('xgboost-ubj', 'model.ubj'),
+    'LSTM': ('keras', 'model.keras'),
+    'Prophet': ('prophet-json', 'model.json')
+}
+
+# Multi-horizon models (ModelTrainer.horizon_models) are registered under their own entry names
+MULTI_HORIZON_SUFFIX = ' (multi-horizon)'
+
+def horizon_entry(model_name):
+    """Registry name of model_name's multi-horizon model, e.g. 'XGBoost (multi-horizon)'"""
+    return model_name + MULTI_HORIZON_SUFFIX
+
+def _base_name(model_name):
+    """Model type of a registry name: the model name without the multi-horizon suffix"""
+    return model_name[:-len(MULTI_HORIZON_SUFFIX)] if model_name.endswith(MULTI_HORIZON_SUFFIX) else model_name
+
+def fitted_objects(trainer, model_name):
+    """The fitted model and scaler (None without one) of trainer that registry name model_name saves"""
+    base_name = _base_name(model_name)
+    if base_name != model_name:
+        return trainer.horizon_models[base_name], trainer.horizon_scalers.get(base_name)
+    
+    return trainer.models[model_name], trainer.scalers.get(model_name)
+
+def _json_metrics(metrics):
+    """Metrics as JSON-safe floats; per-horizon metrics are nested one level"""
+    return {str(key): _json_metrics(value) if isinstance(value, dict) else float(value) for key, value in metrics.items()}
+
+def training_data_hash(X_train, y_train):
+    """Content hash of the arrays a model was fitted on"""
+    digest = hashlib.sha256()
+    for array in (X_train, y_train):
+        array = np.ascontiguousarray(array)
+        digest.update(repr((array.shape, array.dtype.str)).encode())
+        digest.update(array.tobytes())
+    
+    return digest.hexdigest()
+
+def _model_dir(model_name, registry_dir):
+    return os.path.join(registry_dir, re.sub(r'[^a-z0-9]+', '_', model_name.lower()).strip('_'))
+
+def model_path(model_name, version, registry_dir=REGISTRY_DIR):
+    """Path of the saved model file of one registry version"""
+    return os.path.join(_model_dir(model_name, registry_dir), f'v{version}', MODEL_FORMATS[_base_name(model_name)][1])
+
+def list_versions(model_name, registry_dir=REGISTRY_DIR):
+    """Metadata of every saved version of model_name, newest first"""
+    directory = _model_dir(model_name, registry_dir)
+    if not os.path.isdir(directory):
+        return []
+    
+    versions = []
+    for name in os.listdir(directory):
+        metadata_path = os.path.join(directory, name, 'metadata.json')
+        if re.fullmatch(r'v\d+', name) and os.path.exists(metadata_path):
+            with open(metadata_path) as f:
+                versions.append(json.load(f))
+    
+    return sorted(versions, key=lambda metadata: metadata['version'], reverse=True)
+
+def _save_model(model_name, model, path):
+    if model_name == 'XGBoost':
+        model.save_model(path)
+    elif model_name == 'LSTM':
+        model.save(path)
+    elif model_name == 'Prophet':
+        from prophet.serialize import model_to_json
+        with open(path, 'w') as f:
+            f.write(model_to_json(model))
+    else:
+        import joblib
+        # Uncompressed, so the tree arrays can be memory-mapped on load
+        joblib.dump(model, path)
+
+def _load_model(model_name, path):
+    if model_name == 'XGBoost':
+        import xgboost as xgb
+        model = xgb.XGBRegressor()
+        model.load_model(path)
+        return model
+    elif model_name == 'LSTM':
+        from tensorflow.keras.models import load_model
+        return load_model(path)
+    elif model_name == 'Prophet':
+        from prophet.serialize import model_from_json
+        with open(path) as f:
+            return model_from_json(f.read())
+    
+    import joblib
+    return joblib.load(path, mmap_mode='r')
+
+def register_model(trainer, model_name, feature_names, data_hash, metrics=None, registry_dir=REGISTRY_DIR,
+                   keep=REGISTRY_KEEP_VERSIONS):
+    """Save trainer's fitted model_name (and its scaler) as a new version; returns the version
+    
+    The version directory is written under a temporary name and renamed into
+    place, so readers never see a half-written entry. Only the newest keep
+    versions of the model are kept afterwards. model_name may be a
+    horizon_entry, which saves the trainer's multi-horizon model and its
+    horizons.
+    """
+    import joblib
+    
+    directory = _model_dir(model_name, registry_dir)
+    os.makedirs(directory, exist_ok=True)
+    model_format, file_name = MODEL_FORMATS[_base_name(model_name)]
+    model, scaler = fitted_objects(trainer, model_name)
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=directory)
+    
+    try:
+        _save_model(_base_name(model_name), model, os.path.join(staging, file_name))
+        if scaler is not None:
+            joblib.dump(scaler, os.path.join(staging, 'scaler.joblib'))
+        
+        # Concurrent writers race for the next version number; the loser retries
+        while True:
+            existing = list_versions(model_name, registry_dir)
+            version = existing[0]['version'] + 1 if existing else 1
+            metadata = {
+                'model_name': model_name,
+                'version': version,
+                'format': model_format,
+                'file': file_name,
+                'feature_names': list(feature_names),
+                'data_hash': data_hash,
+                'has_scaler': scaler is not None,
+                'metrics': _json_metrics(metrics or {}),
+                'created_at': time.time()
+            }
+            if model_name != _base_name(model_name):
+                metadata['horizons'] = list(trainer.horizons)
+            with open(os.path.join(staging, 'metadata.json'), 'w') as f:
+                json.dump(metadata, f, indent=2)
+            
+            try:
+                os.rename(staging, os.path.join(directory, f'v{version}'))
+                break
+            except OSError:
+                if not os.path.exists(os.path.join(directory, f'v{version}')):
+                    raise
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    
+    prune_versions(model_name, keep, registry_dir)
+    return version
+
+def prune_versions(model_name, keep=REGISTRY_KEEP_VERSIONS, registry_dir=REGISTRY_DIR):
+    """Delete all but the newest keep versions of model_name, dropping them from the shared cache
+    
+    A version a live session may still load (see warm_load), and every version
+    newer than it, is kept regardless.
+    """
+    directory = _model_dir(model_name, registry_dir)
+    with _pending_lock:
+        pending = [version for (model_dir, version) in _pending_versions if model_dir == directory]
+    oldest_pending = min(pending, default=None)
+    
+    for metadata in list_versions(model_name, registry_dir)[keep:]:
+        if oldest_pending is not None and metadata['version'] >= oldest_pending:
+            continue
+        
+        path = model_path(model_name, metadata['version'], registry_dir)
+        shared_cache.discard(('model', path))
+        shared_cache.discard(('scaler', os.path.join(os.path.dirname(path), 'scaler.joblib')))
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+def find_model(model_name, feature_names, data_hash, registry_dir=REGISTRY_DIR):
+    """Metadata of the newest version trained on the same features and data, or None"""
+    for metadata in list_versions(model_name, registry_dir):
+        if metadata['feature_names'] == list(feature_names) and metadata['data_hash'] == data_hash:
+            return metadata
+    
+    return None
+
+def _release_pending(key):
+    with _pending_lock:
+        _pending_versions[key] -= 1
+        if _pending_versions[key] <= 0:
+            del _pending_versions[key]
+
+class _PendingModel:
+    """A registry entry that has not been read from disk yet
+    
+    While it exists its version is marked as pending, so prune_versions keeps
+    the files; the mark is released when the entry is loaded and dropped.
+    """
+    def __init__(self, model_name, version, registry_dir=REGISTRY_DIR):
+        self.model_name = model_name
+        self.version = version
+        self.path = model_path(model_name, version, registry_dir)
+        
+        key = (_model_dir(model_name, registry_dir), version)
+        with _pending_lock:
+            _pending_versions[key] += 1
+        weakref.finalize(self, _release_pending, key)
+    
+    def load(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(
+                f"{self.model_name} v{self.version} was pruned from the model registry; train or reload the models"
+            )
+        
+        # Every session loading this (immutable) version shares one read-only copy
+        # Counted at its file size, which tracks the loaded model without serializing it again
+        return shared_cache.get_or_create(
+            ('model', self.path), lambda: _load_model(_base_name(self.model_name), self.path), nbytes=os.path.getsize(self.path)
+        )
+
+class LazyModels(dict):
+    """Model dict whose registry entries are only deserialized on first access"""
+    def __getitem__(self, model_name):
+        model = super().__getitem__(model_name)
+        if isinstance(model, _PendingModel):
+            model = model.load()
+            super().__setitem__(model_name, model)
+        
+        return model
+    
+    def get(self, model_name, default=None):
+        return self[model_name] if model_name in self else default
+    
+    def values(self):
+        return [self[model_name] for model_name in self]
+    
+    def items(self):
+        return [(model_name, self[model_name]) for model_name in self]
+
+def warm_load(trainer, model_names, feature_names, data_hash, registry_dir=REGISTRY_DIR):
+    """Attach the newest matching registry version of each model to trainer
+    
+    Models already on trainer are left alone. Scalers are read immediately, the
+    models themselves on first use. Returns {model_name: metrics} for the
+    models that were found.
+    """
+    import joblib
+    
+    if not isinstance(trainer.models, LazyModels):
+        trainer.models = LazyModels(trainer.models)
+    
+    loaded = {}
+    for model_name in model_names:
+        if model_name in trainer.models:
+            continue
+        
+        metadata = find_model(model_name, feature_names, data_hash, registry_dir)
+        if metadata is None:
+            continue
+        
+        path = model_path(model_name, metadata['version'], registry_dir)
+        if metadata['has_scaler']:
+            scaler_path = os.path.join(os.path.dirname(path), 'scaler.joblib')
+            trainer.scalers[model_name] = shared_cache.get_or_create(
+                ('scaler', scaler_path), lambda: joblib.load(scaler_path), nbytes=os.path.getsize(scaler_path)
+            )
+        dict.__setitem__(trainer.models, model_name, _PendingModel(model_name, metadata['version'], registry_dir))
+        loaded[model_name] = metadata['metrics']
+    
+    return loaded
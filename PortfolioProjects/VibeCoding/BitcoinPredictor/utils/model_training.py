@@ -1,51 +1,121 @@
+import copy
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler, MinMaxScaler
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-import xgboost as xgb
-from prophet import Prophet
-import tensorflow as tf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-from tensorflow.keras.optimizers import Adam
 import streamlit as st
 import warnings
 warnings.filterwarnings('ignore')
 
+# Models whose training uses several cores; the rest are effectively single-threaded
+MULTI_CORE_MODELS = {'Random Forest', 'XGBoost', 'LSTM'}
+
+# Thread-count variables read by OpenMP/BLAS/TensorFlow when they first load
+THREAD_LIMIT_VARIABLES = [
+    'OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+    'TF_NUM_INTRAOP_THREADS', 'TF_NUM_INTEROP_THREADS'
+]
+
+# Models with a direct multi-horizon mode: one fit predicts every horizon at once
+MULTI_HORIZON_MODELS = ['Linear Regression', 'Random Forest', 'XGBoost']
+
+# Incremental updates: trees/rounds added per update, fitted on the most recent rows
+UPDATE_WINDOW = 365
+UPDATE_TREES = 10
+UPDATE_ROUNDS = 10
+
+# Models with an incremental update path; the rest are retrained from scratch
+INCREMENTAL_MODELS = ['Linear Regression', 'Random Forest', 'XGBoost', 'Prophet']
+
+def _worker_count(model_names, max_workers=None, cores=None):
+    """Training jobs run at once: max_workers (default one per core), at most one per model"""
+    return max(1, min(max_workers or cores or os.cpu_count() or 1, len(model_names)))
+
+def core_budgets(model_names, max_workers=None, cores=None):
+    """Cores each training job may use, so concurrent jobs never oversubscribe the CPU
+    
+    Up to max_workers jobs (default: one per core) run at once; multi-core models
+    split the cores (default: all of them) evenly between those slots, the rest
+    get a single core.
+    """
+    cores = cores or os.cpu_count() or 1
+    share = max(1, cores // _worker_count(model_names, max_workers, cores))
+    
+    return {name: share if name in MULTI_CORE_MODELS else 1 for name in model_names}
+
+def _training_job(model_name, n_jobs, X_train, y_train, X_val, y_val, df, data_rows, horizon):
+    """Train one model in a worker process within its core budget"""
+    for variable in THREAD_LIMIT_VARIABLES:
+        os.environ[variable] = str(n_jobs)
+    
+    from threadpoolctl import threadpool_limits
+    
+    trainer = ModelTrainer()
+    with threadpool_limits(limits=n_jobs):
+        metrics = trainer.train_model(model_name, X_train, y_train, X_val, y_val, df, n_jobs, data_rows, horizon)
+    
+    model = trainer.models.get(model_name)
+    if model_name == 'Prophet' and model is not None:
+        # Prophet models only survive the trip back as JSON
+        from prophet.serialize import model_to_json
+        model = model_to_json(model)
+    
+    return metrics, model, trainer.scalers.get(model_name), trainer.update_state.get(model_name)
+
+def _on_script_thread():
+    """Whether this runs inside a Streamlit script run, where st.error reaches the page"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    
+    return get_script_run_ctx(suppress_warning=True) is not None
+
 class ModelTrainer:
-    def __init__(self):
+    """Trains and serves the price models
+    
+    Each backend (scikit-learn, XGBoost, TensorFlow, Prophet) is imported the
+    first time one of its models is trained, so creating a ModelTrainer or
+    predicting with already trained models never loads the others.
+    
+    A failed training is shown with st.error and returns None. Where no page
+    can show it (worker processes, background threads) it raises instead, so
+    the caller gets the message; raise_errors=True always raises.
+    """
+    def __init__(self, raise_errors=None):
+        self.raise_errors = raise_errors
         self.models = {}
         self.scalers = {}
         self.feature_names = []
+        self.horizon_models = {}
+        self.horizon_scalers = {}
+        self.horizons = []
+        self.horizon_feature_names = []
+        self.update_state = {}
         
-    def prepare_data_for_lstm(self, X, y, sequence_length=60):
-        """Prepare data for LSTM model"""
-        X_lstm = []
-        y_lstm = []
+    def _training_error(self, message):
+        """Report a training failure; called from the except block, so raising chains the original error"""
+        raise_errors = self.raise_errors if self.raise_errors is not None else not _on_script_thread()
+        if raise_errors:
+            raise RuntimeError(message)
         
-        for i in range(sequence_length, len(X)):
-            X_lstm.append(X[i-sequence_length:i])
-            y_lstm.append(y[i])
-        
-        return np.array(X_lstm), np.array(y_lstm)
+        st.error(message)
     
     def train_linear_regression(self, X_train, y_train, X_val, y_val):
-        """Train Linear Regression model"""
+        """Train Linear Regression model
+        
+        The model keeps its sufficient statistics (see StreamingLinearRegression),
+        so later updates and sliding windows never refit from scratch.
+        """
         try:
-            # Scale features
-            scaler = StandardScaler()
-            X_train_scaled = scaler.fit_transform(X_train)
-            X_val_scaled = scaler.transform(X_val)
+            from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+            from utils.linear_model import StreamingLinearRegression
             
-            # Train model
-            model = LinearRegression()
-            model.fit(X_train_scaled, y_train)
+            # Train model (features are standardized inside the model)
+            model = StreamingLinearRegression()
+            model.fit(X_train, y_train)
             
             # Predictions
-            train_pred = model.predict(X_train_scaled)
-            val_pred = model.predict(X_val_scaled)
+            train_pred = model.predict(X_train)
+            val_pred = model.predict(X_val)
             
             # Metrics
             metrics = {
@@ -58,22 +128,25 @@ class ModelTrainer:
             }
             
             self.models['Linear Regression'] = model
-            self.scalers['Linear Regression'] = scaler
+            self.scalers.pop('Linear Regression', None)
             
             return metrics
         except Exception as e:
-            st.error(f"Error training Linear Regression: {str(e)}")
+            self._training_error(f"Error training Linear Regression: {str(e)}")
             return None
     
-    def train_random_forest(self, X_train, y_train, X_val, y_val):
+    def train_random_forest(self, X_train, y_train, X_val, y_val, n_jobs=-1):
         """Train Random Forest model"""
         try:
+            from sklearn.ensemble import RandomForestRegressor
+            from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+            
             # Train model
             model = RandomForestRegressor(
                 n_estimators=100,
                 max_depth=10,
                 random_state=42,
-                n_jobs=-1
+                n_jobs=n_jobs
             )
             model.fit(X_train, y_train)
             
@@ -95,19 +168,22 @@ class ModelTrainer:
             
             return metrics
         except Exception as e:
-            st.error(f"Error training Random Forest: {str(e)}")
+            self._training_error(f"Error training Random Forest: {str(e)}")
             return None
     
-    def train_xgboost(self, X_train, y_train, X_val, y_val):
+    def train_xgboost(self, X_train, y_train, X_val, y_val, n_jobs=-1):
         """Train XGBoost model"""
         try:
+            import xgboost as xgb
+            from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+            
             # Train model
             model = xgb.XGBRegressor(
                 n_estimators=100,
                 max_depth=6,
                 learning_rate=0.1,
                 random_state=42,
-                n_jobs=-1
+                n_jobs=n_jobs
             )
             model.fit(X_train, y_train)
             
@@ -129,19 +205,132 @@ class ModelTrainer:
             
             return metrics
         except Exception as e:
-            st.error(f"Error training XGBoost: {str(e)}")
+            self._training_error(f"Error training XGBoost: {str(e)}")
             return None
     
-    def train_lstm(self, X_train, y_train, X_val, y_val, sequence_length=60):
-        """Train LSTM model - skipped due to TensorFlow compatibility issues"""
-        # LSTM is currently disabled due to persistent TensorFlow batch processing bugs
-        # The app works perfectly with the other 4 models (Linear Regression, Random Forest, XGBoost, Prophet)
-        st.info("ℹ️ LSTM training is currently disabled due to TensorFlow compatibility issues. Using 4 other models for predictions.")
-        return None
+    def _lstm_dataset(self, X_scaled, y_scaled, sequence_length, batch_size, shuffle=False):
+        """tf.data pipeline of (sequence, next target) batches, windowed lazily from X_scaled
+        
+        Training batches drop the remainder so every step has the same fixed shape.
+        """
+        import tensorflow as tf
+        
+        dataset = tf.keras.utils.timeseries_dataset_from_array(
+            X_scaled[:-1],
+            y_scaled[sequence_length:],
+            sequence_length=sequence_length,
+            batch_size=None,
+            shuffle=shuffle,
+            seed=42
+        )
+        dataset = dataset.batch(batch_size, drop_remainder=shuffle)
+        
+        return dataset.prefetch(tf.data.AUTOTUNE)
+    
+    def _build_lstm(self, sequence_length, n_features):
+        """Compiled two-layer LSTM regressor"""
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
+        from tensorflow.keras.optimizers import Adam
+        
+        model = Sequential([
+            Input(shape=(sequence_length, n_features)),
+            LSTM(50, return_sequences=True),
+            Dropout(0.2),
+            LSTM(50),
+            Dropout(0.2),
+            Dense(25),
+            Dense(1)
+        ])
+        model.compile(optimizer=Adam(learning_rate=0.001), loss='mse')
+        
+        return model
+    
+    def train_lstm(self, X_train, y_train, X_val, y_val, sequence_length=60, epochs=20, batch_size=32):
+        """Train LSTM model"""
+        if len(X_train) < sequence_length + batch_size:
+            st.warning(f"⚠️ LSTM needs at least {sequence_length + batch_size} training rows. Only {len(X_train)} available. Skipping LSTM.")
+            return None
+        
+        # Validation sequences borrow their history from the training tail, so any validation row gives one
+        has_validation = len(X_val) > 0
+        if not has_validation:
+            st.warning("⚠️ No validation rows for LSTM. Training without early stopping on validation loss; validation metrics are skipped.")
+        
+        try:
+            from sklearn.preprocessing import MinMaxScaler
+            from tensorflow.keras.callbacks import EarlyStopping
+            from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+            
+            # Scale features and target
+            scaler_X = MinMaxScaler()
+            scaler_y = MinMaxScaler()
+            X_train_scaled = scaler_X.fit_transform(X_train).astype(np.float32)
+            y_train_scaled = scaler_y.fit_transform(np.reshape(y_train, (-1, 1))).astype(np.float32)
+            
+            train_dataset = self._lstm_dataset(X_train_scaled, y_train_scaled, sequence_length, batch_size, shuffle=True)
+            train_eval_dataset = self._lstm_dataset(X_train_scaled, y_train_scaled, sequence_length, batch_size)
+            val_dataset = None
+            if has_validation:
+                X_val_scaled = scaler_X.transform(X_val).astype(np.float32)
+                y_val_scaled = scaler_y.transform(np.reshape(y_val, (-1, 1))).astype(np.float32)
+                
+                # Validation sequences start in the training tail, so every validation row gets a prediction
+                X_val_context = np.concatenate([X_train_scaled[-sequence_length:], X_val_scaled])
+                y_val_context = np.concatenate([y_train_scaled[-sequence_length:], y_val_scaled])
+                val_dataset = self._lstm_dataset(X_val_context, y_val_context, sequence_length, batch_size)
+            
+            # Build model
+            model = self._build_lstm(sequence_length, X_train_scaled.shape[1])
+            
+            # Train model
+            model.fit(
+                train_dataset,
+                validation_data=val_dataset,
+                epochs=epochs,
+                callbacks=[EarlyStopping(monitor='val_loss' if has_validation else 'loss', patience=3, restore_best_weights=True)],
+                verbose=0
+            )
+            
+            # Predictions
+            train_pred = scaler_y.inverse_transform(model.predict(train_eval_dataset, verbose=0)).ravel()
+            y_train_seq = np.asarray(y_train)[sequence_length:]
+            
+            # Metrics
+            metrics = {
+                'train_mae': mean_absolute_error(y_train_seq, train_pred),
+                'train_rmse': np.sqrt(mean_squared_error(y_train_seq, train_pred)),
+                'train_r2': r2_score(y_train_seq, train_pred),
+                'val_mae': np.nan,
+                'val_rmse': np.nan,
+                'val_r2': np.nan
+            }
+            if has_validation:
+                val_pred = scaler_y.inverse_transform(model.predict(val_dataset, verbose=0)).ravel()
+                metrics.update({
+                    'val_mae': mean_absolute_error(y_val, val_pred),
+                    'val_rmse': np.sqrt(mean_squared_error(y_val, val_pred)),
+                    'val_r2': r2_score(y_val, val_pred)
+                })
+            
+            self.models['LSTM'] = model
+            self.scalers['LSTM'] = {
+                'X': scaler_X,
+                'y': scaler_y,
+                'sequence_length': sequence_length
+            }
+            
+            return metrics
+        except Exception as e:
+            self._training_error(f"Error training LSTM: {str(e)}")
+            return None
     
     def train_prophet(self, df, target_column='Close'):
         """Train Prophet model"""
         try:
+            from prophet import Prophet
+            from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+            
             # Prepare data for Prophet
             prophet_data = df[['Date', target_column]].copy()
             prophet_data.columns = ['ds', 'y']
@@ -175,8 +364,308 @@ class ModelTrainer:
             
             return metrics
         except Exception as e:
-            st.error(f"Error training Prophet: {str(e)}")
+            self._training_error(f"Error training Prophet: {str(e)}")
+            return None
+    
+    def train_model(self, model_name, X_train, y_train, X_val, y_val, df=None, n_jobs=-1, data_rows=None, horizon=1):
+        """Train one model by name; df is the processed data Prophet trains on
+        
+        data_rows is the length of the full feature matrix the splits were cut
+        from (held-out rows included) and horizon its forecast days. Both are
+        recorded so update_model later folds in only the rows appended after
+        them; without data_rows the model cannot be updated incrementally.
+        """
+        if model_name == 'Linear Regression':
+            metrics = self.train_linear_regression(X_train, y_train, X_val, y_val)
+        elif model_name == 'Random Forest':
+            metrics = self.train_random_forest(X_train, y_train, X_val, y_val, n_jobs=n_jobs)
+        elif model_name == 'XGBoost':
+            metrics = self.train_xgboost(X_train, y_train, X_val, y_val, n_jobs=n_jobs)
+        elif model_name == 'LSTM':
+            metrics = self.train_lstm(X_train, y_train, X_val, y_val)
+        elif model_name == 'Prophet':
+            metrics = self.train_prophet(df, target_column='Close')
+        else:
+            raise ValueError(f"Unknown model: {model_name}")
+        
+        if metrics is not None and model_name in INCREMENTAL_MODELS:
+            if model_name == 'Prophet':
+                # Prophet trains on every row of df, so nothing is held out
+                self.update_state[model_name] = {'n_rows': len(df), 'held_out': (len(df), len(df))}
+            elif data_rows is not None:
+                # Validation and test rows follow the training rows and are never fitted
+                self.update_state[model_name] = {'n_rows': data_rows, 'held_out': (len(X_train), data_rows), 'horizon': horizon}
+        
+        return metrics
+    
+    def train_models(self, model_names, X_train, y_train, X_val, y_val, df=None, max_workers=None, data_rows=None,
+                     horizon=1, cores=None):
+        """Train several models concurrently, yielding (model_name, metrics, error) as each finishes
+        
+        Jobs run in a process pool with core_budgets cores each. metrics is None
+        when a model was skipped or failed; error holds the exception message if
+        the job raised. Trained models are added to this trainer as they arrive.
+        
+        Args:
+            max_workers: Concurrent jobs; defaults to one per core. With a single
+                worker the models are trained here, in order, without a pool.
+            data_rows, horizon: As in train_model
+            cores: CPU cores the jobs share; defaults to all of them
+        """
+        budgets = core_budgets(model_names, max_workers, cores)
+        workers = _worker_count(model_names, max_workers, cores)
+        if df is not None:
+            df = df[['Date', 'Close']]
+        
+        if workers == 1:
+            for model_name in model_names:
+                try:
+                    yield model_name, self.train_model(
+                        model_name, X_train, y_train, X_val, y_val, df, budgets[model_name], data_rows, horizon
+                    ), None
+                except Exception as e:
+                    yield model_name, None, str(e)
+            return
+        
+        # Fresh spawned process per job, so thread limits apply before any backend loads
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, max_tasks_per_child=1) as pool:
+            futures = {
+                pool.submit(
+                    _training_job, model_name, budgets[model_name], X_train, y_train, X_val, y_val, df, data_rows, horizon
+                ): model_name
+                for model_name in model_names
+            }
+            
+            for future in as_completed(futures):
+                model_name = futures[future]
+                try:
+                    metrics, model, scaler, update_state = future.result()
+                except Exception as e:
+                    yield model_name, None, str(e)
+                    continue
+                
+                if model is not None:
+                    if model_name == 'Prophet':
+                        from prophet.serialize import model_from_json
+                        model = model_from_json(model)
+                    self.models[model_name] = model
+                if scaler is not None:
+                    self.scalers[model_name] = scaler
+                if update_state is not None:
+                    self.update_state[model_name] = update_state
+                
+                yield model_name, metrics, None
+    
+    def _update_linear_regression(self, X, y, state):
+        """Add the new rows to a copy of the model's sufficient statistics"""
+        from utils.linear_model import StreamingLinearRegression
+        
+        if not isinstance(self.models['Linear Regression'], StreamingLinearRegression):
+            raise ValueError("Model predates incremental updates; retrain it once")
+        
+        model = copy.deepcopy(self.models['Linear Regression'])
+        return model.partial_fit(X[state['n_rows']:], y[state['n_rows']:])
+    
+    def _update_random_forest(self, X, y):
+        """Add UPDATE_TREES trees fitted on the recent rows and retire as many of the oldest"""
+        model = copy.deepcopy(self.models['Random Forest'])
+        n_trees = len(model.estimators_)
+        
+        model.set_params(warm_start=True, n_estimators=n_trees + UPDATE_TREES)
+        model.fit(X[-UPDATE_WINDOW:], y[-UPDATE_WINDOW:])
+        model.estimators_ = model.estimators_[UPDATE_TREES:]
+        model.set_params(warm_start=False, n_estimators=n_trees)
+        
+        return model
+    
+    def _update_xgboost(self, X, y):
+        """Continue boosting the previous booster for UPDATE_ROUNDS rounds on the recent rows"""
+        import xgboost as xgb
+        
+        previous = self.models['XGBoost']
+        
+        # Training continues on a copy of the booster; the previous model is left as it was
+        model = xgb.XGBRegressor(**{**previous.get_params(), 'n_estimators': UPDATE_ROUNDS})
+        model.fit(X[-UPDATE_WINDOW:], y[-UPDATE_WINDOW:], xgb_model=previous.get_booster())
+        
+        return model
+    
+    def _update_prophet(self, df, target_column='Close'):
+        """Refit Prophet on all the data, starting the optimizer from the previous parameters"""
+        from prophet import Prophet
+        
+        previous = self.models['Prophet']
+        init = {name: previous.params[name][0][0] for name in ['k', 'm', 'sigma_obs']}
+        init.update({name: previous.params[name][0] for name in ['delta', 'beta']})
+        
+        prophet_data = df[['Date', target_column]].copy()
+        prophet_data.columns = ['ds', 'y']
+        
+        model = Prophet(seasonality_mode='multiplicative')
+        model.add_seasonality(name='daily', period=1, fourier_order=5)
+        model.add_seasonality(name='weekly', period=7, fourier_order=3)
+        model.add_seasonality(name='yearly', period=365.25, fourier_order=10)
+        model.fit(prophet_data, init=init)
+        
+        return model
+    
+    def update_model(self, model_name, X, y, df=None, horizon=1):
+        """Fold the rows added since model_name was trained into it, without a full retrain
+        
+        X and y are the full feature matrix and target for horizon, extended at
+        the end with the new days; only the rows after the data_rows recorded at
+        training time are new. Linear Regression adds exactly those rows to its
+        sufficient statistics, Random Forest and XGBoost add trees/boosting
+        rounds fitted on the last UPDATE_WINDOW rows, Prophet restarts its
+        optimizer from the previous parameters. The previous model (possibly
+        shared with other sessions) is never modified; the updated one replaces
+        it on this trainer.
+        
+        Returns None if the model has no incremental state or nothing is new,
+        {'skipped': reason} if y is for a different horizon than the model's,
+        {'error': message} if the update failed, and otherwise {'new_rows', 'new_mae', 'held_out_fitted'}: new_mae is the
+        previous model's MAE on the new rows (an out-of-sample check; None for
+        Prophet), held_out_fitted whether the update fitted rows that were held
+        out at training time, so test metrics on them are no longer out of sample.
+        """
+        state = self.update_state.get(model_name)
+        if model_name not in INCREMENTAL_MODELS or model_name not in self.models or state is None:
+            return None
+        
+        if model_name != 'Prophet' and state['horizon'] != horizon:
+            return {'skipped': f"trained for a {state['horizon']}-day horizon, not {horizon}"}
+        
+        n_rows = len(df) if model_name == 'Prophet' else len(X)
+        new_rows = n_rows - state['n_rows']
+        if new_rows <= 0:
+            return None
+        
+        try:
+            from sklearn.metrics import mean_absolute_error
+            
+            # Error of the model as it was on the days it has not seen
+            new_mae = None
+            if model_name != 'Prophet':
+                new_mae = mean_absolute_error(y[state['n_rows']:], self.predict(model_name, X[state['n_rows']:]))
+            
+            # First row the update fits: the tree updates refit a recent window reaching back before the new rows
+            if model_name == 'Linear Regression':
+                model = self._update_linear_regression(X, y, state)
+                fitted_from = state['n_rows']
+            elif model_name == 'Random Forest':
+                model = self._update_random_forest(X, y)
+                fitted_from = max(0, n_rows - UPDATE_WINDOW)
+            elif model_name == 'XGBoost':
+                model = self._update_xgboost(X, y)
+                fitted_from = max(0, n_rows - UPDATE_WINDOW)
+            else:
+                model = self._update_prophet(df)
+                fitted_from = 0
+            
+            held_out_start, held_out_end = state['held_out']
+            held_out_fitted = held_out_start < held_out_end and fitted_from < held_out_end
+            
+            self.models[model_name] = model
+            self.update_state[model_name] = {
+                **state,
+                'n_rows': n_rows,
+                'held_out': (held_out_start, held_out_start) if held_out_fitted else state['held_out']
+            }
+            
+            return {'new_rows': new_rows, 'new_mae': new_mae, 'held_out_fitted': held_out_fitted}
+        except Exception as e:
+            return {'error': str(e)}
+    
+    def _horizon_estimator(self, model_name, n_jobs):
+        """Unfitted estimator that predicts every column of a 2-D target natively"""
+        if model_name == 'Linear Regression':
+            from sklearn.linear_model import LinearRegression
+            return LinearRegression()
+        elif model_name == 'Random Forest':
+            from sklearn.ensemble import RandomForestRegressor
+            return RandomForestRegressor(n_estimators=100, max_depth=10, random_state=42, n_jobs=n_jobs)
+        elif model_name == 'XGBoost':
+            import xgboost as xgb
+            # Multi-target fit: one booster, one tree per horizon each round, sharing the
+            # binned features ('multi_output_tree' vector leaves measured slower on this data)
+            return xgb.XGBRegressor(
+                n_estimators=100,
+                max_depth=6,
+                learning_rate=0.1,
+                random_state=42,
+                n_jobs=n_jobs,
+                tree_method='hist'
+            )
+        
+        raise ValueError(f"No multi-horizon mode for {model_name}")
+    
+    def train_multi_horizon(self, model_name, X_train, Y_train, X_val, Y_val, horizons, n_jobs=-1):
+        """Train one multi-output model that predicts every horizon in a single call
+        
+        Args:
+            Y_train, Y_val: 2-D targets with one column per horizon, as built by
+                create_features_target with a list of forecast_days
+            horizons: Days ahead of each target column
+        
+        Returns {horizon: metrics}, or None if training failed.
+        """
+        try:
+            from sklearn.preprocessing import StandardScaler
+            from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+            
+            model = self._horizon_estimator(model_name, n_jobs)
+            
+            # Only the linear model needs scaled features
+            scaler = None
+            if model_name == 'Linear Regression':
+                scaler = StandardScaler()
+                X_train = scaler.fit_transform(X_train)
+                X_val = scaler.transform(X_val)
+            
+            # Train model
+            model.fit(X_train, Y_train)
+            
+            # Predictions, (n_samples, n_horizons)
+            train_pred = np.reshape(model.predict(X_train), np.shape(Y_train))
+            val_pred = np.reshape(model.predict(X_val), np.shape(Y_val))
+            
+            # Metrics per horizon
+            metrics = {}
+            for i, horizon in enumerate(horizons):
+                metrics[int(horizon)] = {
+                    'train_mae': mean_absolute_error(Y_train[:, i], train_pred[:, i]),
+                    'train_rmse': np.sqrt(mean_squared_error(Y_train[:, i], train_pred[:, i])),
+                    'train_r2': r2_score(Y_train[:, i], train_pred[:, i]),
+                    'val_mae': mean_absolute_error(Y_val[:, i], val_pred[:, i]),
+                    'val_rmse': np.sqrt(mean_squared_error(Y_val[:, i], val_pred[:, i])),
+                    'val_r2': r2_score(Y_val[:, i], val_pred[:, i])
+                }
+            
+            # Every multi-horizon model shares one set of horizons
+            if list(horizons) != self.horizons:
+                self.horizon_models = {}
+                self.horizon_scalers = {}
+                self.horizons = [int(horizon) for horizon in horizons]
+            
+            self.horizon_models[model_name] = model
+            if scaler is not None:
+                self.horizon_scalers[model_name] = scaler
+            
+            return metrics
+        except Exception as e:
+            self._training_error(f"Error training multi-horizon {model_name}: {str(e)}")
+            return None
+    
+    def predict_horizons(self, model_name, X):
+        """Predictions of a multi-horizon model, shape (len(X), len(self.horizons))"""
+        if model_name not in self.horizon_models:
             return None
+        
+        if model_name in self.horizon_scalers:
+            X = self.horizon_scalers[model_name].transform(X)
+        
+        return np.reshape(self.horizon_models[model_name].predict(X), (len(X), len(self.horizons)))
     
     def predict(self, model_name, X):
         """Make predictions with specified model"""
@@ -186,9 +675,10 @@ class ModelTrainer:
         model = self.models[model_name]
         
         if model_name == 'Linear Regression':
-            scaler = self.scalers[model_name]
-            X_scaled = scaler.transform(X)
-            return model.predict(X_scaled)
+            # Models saved before the streaming regression still come with a scaler
+            if model_name in self.scalers:
+                X = self.scalers[model_name].transform(X)
+            return model.predict(X)
         
         elif model_name in ['Random Forest', 'XGBoost']:
             return model.predict(X)
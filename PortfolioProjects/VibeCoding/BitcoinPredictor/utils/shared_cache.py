@@ -0,0 +1,191 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# Memory budget of the process-wide cache, in MB
+SHARED_CACHE_MB = int(os.environ.get('SHARED_CACHE_MB', 1024))
+
+def estimate_size(value):
+    """Approximate bytes held by a cached value"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(estimate_size(item) for item in value.values())
+    if value is None:
+        return 0
+    
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+def content_hash(data):
+    """SHA-256 of raw bytes, e.g. an uploaded file, for use in cache keys"""
+    return hashlib.sha256(data).hexdigest()
+
+class SharedCache:
+    """Thread-safe LRU cache shared by every session of the Streamlit server
+    
+    Entries are evicted least recently used first once their estimated size
+    exceeds budget_bytes. Values are shared between sessions, so callers must
+    treat them as read-only.
+    """
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+    
+    def put(self, key, value, nbytes=None):
+        """Cache value under key and return the shared value for key
+        
+        If another session stored key first, its value is returned instead, so
+        every session ends up holding the same object.
+        """
+        nbytes = estimate_size(value) if nbytes is None else nbytes
+        
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            
+            self._entries[key] = (value, nbytes)
+            self.total_bytes += nbytes
+            self._evict()
+        
+        return value
+    
+    def get_or_create(self, key, create, nbytes=None):
+        """Cached value for key, calling create() to build it on a miss
+        
+        create runs outside the lock, so a slow build never blocks other keys.
+        Returns None without caching when create does.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        
+        value = create()
+        if value is None:
+            return None
+        
+        return self.put(key, value, nbytes)
+    
+    def _evict(self):
+        # Least recently used first; the entry just stored (the newest) always stays
+        while self.total_bytes > self.budget_bytes and len(self._entries) > 1:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.total_bytes -= nbytes
+            self.evictions += 1
+    
+    def discard(self, key):
+        with self._lock:
+            if key in self._entries:
+                _, nbytes = self._entries.pop(key)
+                self.total_bytes -= nbytes
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'budget_bytes': self.budget_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+class StaleWhileRevalidate:
+    """One value shared by every session, served immediately and refreshed in the background
+    
+    Once the last fetch attempt is ttl seconds old, the next get() starts a
+    refresh in a background thread and still returns the current value without
+    waiting. At most one refresh runs at a time however many sessions ask, and
+    a failed refresh keeps the previous value (its message is kept in error)
+    until the next attempt a ttl later. Only the very first get() waits, up to
+    first_wait seconds, since there is nothing to serve yet.
+    """
+    def __init__(self, fetch, ttl, first_wait=10):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.first_wait = first_wait
+        self.error = None
+        self.fetched_at = None
+        self._value = None
+        self._checked_at = None
+        self._refreshing = None
+        self._lock = threading.Lock()
+    
+    def _refresh(self, done):
+        try:
+            value = self.fetch()
+            error = None if value is not None else "no data returned"
+        except Exception as e:
+            value, error = None, str(e)
+        
+        with self._lock:
+            if value is not None:
+                self._value = value
+                self.fetched_at = time.time()
+            self.error = error
+            self._refreshing = None
+        done.set()
+    
+    def _start_refresh(self):
+        # Called with the lock held; joins the refresh already running, if any
+        if self._refreshing is None:
+            self._refreshing = threading.Event()
+            self._checked_at = time.monotonic()
+            threading.Thread(target=self._refresh, args=(self._refreshing,), daemon=True, name='revalidate').start()
+        
+        return self._refreshing
+    
+    def get(self):
+        """The current value (None until the first fetch succeeds), starting a refresh if it is stale"""
+        with self._lock:
+            done = None
+            if self._checked_at is None or time.monotonic() - self._checked_at >= self.ttl:
+                done = self._start_refresh()
+            value = self._value
+        
+        if value is None and done is not None:
+            done.wait(self.first_wait)
+            with self._lock:
+                value = self._value
+        
+        return value
+    
+    def refresh(self):
+        """Start a refresh now, regardless of age, without waiting for it"""
+        with self._lock:
+            self._start_refresh()
+
+# The one instance every session of this server process shares
+shared_cache = SharedCache(SHARED_CACHE_MB * 1024 * 1024)
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+# Daily bars: crypto trades every day of the year
+PERIODS_PER_YEAR = 365
+
+# Strategy x step cells simulated at once by sweep_strategies; bounds its peak memory (about 8 arrays of this many floats)
+SWEEP_CHUNK_CELLS = 1_000_000
+
+def _hold_forward(signals):
+    """Forward fill NaN along the last axis (positions held between signals), starting flat"""
+    defined = ~np.isnan(signals)
+    last_signal = np.where(defined, np.arange(signals.shape[-1]), -1)
+    np.maximum.accumulate(last_signal, axis=-1, out=last_signal)
+    
+    held = np.take_along_axis(signals, np.maximum(last_signal, 0), axis=-1)
+    return np.where(last_signal >= 0, held, 0.)
+
+def _simulate_grid(current, predicted, actual, thresholds, fees, slippage, initial_capital):
+    """Every (threshold, fee) strategy over the same predictions, as arrays of shape (T, F, n)
+    
+    Long/flat: go long for a day when the predicted return beats threshold,
+    go flat when it falls below -threshold, hold the position in between.
+    Each position change pays fee + slippage on the traded value; an open
+    position is closed at the end.
+    """
+    current = np.asarray(current, dtype=float)
+    expected_return = np.asarray(predicted, dtype=float) / current - 1
+    market_return = np.asarray(actual, dtype=float) / current - 1
+    thresholds = np.asarray(thresholds, dtype=float)[:, None, None]
+    costs = np.asarray(fees, dtype=float)[None, :, None] + slippage
+    
+    # Signals depend only on the threshold; the fee axis broadcasts
+    signals = np.where(expected_return > thresholds, 1., np.where(expected_return < -thresholds, 0., np.nan))
+    positions = _hold_forward(signals)
+    
+    # Turnover per step, including the closing trade after the last step
+    turnover = np.abs(np.diff(positions, axis=-1, prepend=0.))
+    turnover[..., -1] += positions[..., -1]
+    
+    returns = positions * market_return - turnover * costs
+    equity = initial_capital * np.cumprod(1 + returns, axis=-1)
+    drawdown = equity / np.maximum.accumulate(equity, axis=-1) - 1
+    
+    return np.broadcast_to(positions, returns.shape), returns, equity, drawdown, np.broadcast_to(turnover, returns.shape)
+
+def _metrics(returns, equity, drawdown, turnover, initial_capital):
+    """Summary metrics over the last axis"""
+    volatility = returns.std(axis=-1)
+    sharpe = np.divide(
+        returns.mean(axis=-1), volatility, out=np.zeros_like(volatility), where=volatility > 0
+    ) * np.sqrt(PERIODS_PER_YEAR)
+    
+    return {
+        'total_return': (equity[..., -1] / initial_capital - 1) * 100,
+        'sharpe': sharpe,
+        'max_drawdown': drawdown.min(axis=-1) * 100,
+        'trades': np.round(turnover.sum(axis=-1)).astype(int)
+    }
+
+def simulate_strategy(current, predicted, actual, threshold=0.0, fee=0.001, slippage=0.0005, initial_capital=10000):
+    """Simulate the long/flat strategy on one model's predictions
+    
+    Args:
+        current: Price when each prediction is made
+        predicted: Predicted next price
+        actual: Realized next price
+        threshold: Predicted return (e.g. 0.01 for 1%) needed to go long, and
+            the negative of it to go flat
+        fee, slippage: Cost per trade as a fraction of the traded value
+    
+    Returns a dict of per-step arrays (positions, returns, equity, drawdown,
+    buy_hold_equity) and the summary metrics.
+    """
+    positions, returns, equity, drawdown, turnover = (
+        array[0, 0] for array in _simulate_grid(current, predicted, actual, [threshold], [fee], slippage, initial_capital)
+    )
+    result = {key: value.item() for key, value in _metrics(returns, equity, drawdown, turnover, initial_capital).items()}
+    
+    buy_hold_equity = initial_capital * np.asarray(actual, dtype=float) / float(np.asarray(current)[0])
+    result.update({
+        'positions': positions,
+        'returns': returns,
+        'equity': equity,
+        'drawdown': drawdown,
+        'buy_hold_equity': buy_hold_equity,
+        'buy_hold_return': (buy_hold_equity[-1] / initial_capital - 1) * 100
+    })
+    
+    return result
+
+def sweep_strategies(current, predicted, actual, thresholds, fees, slippage=0.0005, initial_capital=10000):
+    """Metrics of every threshold x fee combination, simulated in batches of thresholds
+    
+    Each batch covers at most SWEEP_CHUNK_CELLS strategy x step cells and is
+    reduced to its metrics before the next one, so memory stays bounded
+    however large the grid. Returns a DataFrame with one row per combination.
+    """
+    thresholds = np.asarray(thresholds, dtype=float)
+    fees = np.asarray(fees, dtype=float)
+    batch = max(1, SWEEP_CHUNK_CELLS // max(1, len(fees) * len(current)))
+    
+    batches = []
+    for start in range(0, len(thresholds), batch):
+        _, returns, equity, drawdown, turnover = _simulate_grid(
+            current, predicted, actual, thresholds[start:start + batch], fees, slippage, initial_capital
+        )
+        batches.append(_metrics(returns, equity, drawdown, turnover, initial_capital))
+        del returns, equity, drawdown, turnover
+    
+    metrics = {key: np.concatenate([batch_metrics[key] for batch_metrics in batches]) for key in batches[0]}
+    grid_thresholds, grid_fees = np.meshgrid(thresholds, fees, indexing='ij')
+    
+    return pd.DataFrame({
+        'Threshold': grid_thresholds.ravel(),
+        'Fee': grid_fees.ravel(),
+        'Total Return (%)': metrics['total_return'].ravel(),
+        'Sharpe': metrics['sharpe'].ravel(),
+        'Max Drawdown (%)': metrics['max_drawdown'].ravel(),
+        'Trades': metrics['trades'].ravel()
+    })
+
+def trade_log(positions, current, actual, dates):
+    """BUY/SELL rows for each position change; an open position is sold at the last realized price"""
+    changes = np.diff(positions, prepend=0.)
+    index = np.flatnonzero(changes)
+    trades = pd.DataFrame({
+        'Action': np.where(changes[index] > 0, 'BUY', 'SELL'),
+        'Price': np.asarray(current)[index],
+        'Date': np.asarray(dates)[index]
+    })
+    
+    if len(positions) and positions[-1] > 0:
+        closing = pd.DataFrame({'Action': ['SELL'], 'Price': [np.asarray(actual)[-1]], 'Date': [np.asarray(dates)[-1]]})
+        trades = pd.concat([trades, closing], ignore_index=True)
+    
+    return trades
@@ -0,0 +1,174 @@
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+from utils.model_registry import fitted_objects, find_model, horizon_entry, model_path, register_model, training_data_hash
+from utils.shared_cache import shared_cache
+
+# Jobs training at once across the server (all sessions); the cores are split evenly between them,
+# so one user's job no longer queues behind every other user's, and none oversubscribes the CPU
+TRAINING_JOB_WORKERS = int(os.environ.get('TRAINING_JOB_WORKERS', max(1, (os.cpu_count() or 1) // 4)))
+
+_executor = ThreadPoolExecutor(max_workers=TRAINING_JOB_WORKERS, thread_name_prefix='training-job')
+_job_ids = itertools.count(1)
+
+class TrainingJob:
+    """A batch of models training in the background, with progress readable from any rerun
+    
+    With horizons set, the job trains multi-horizon models instead (see
+    ModelTrainer.train_multi_horizon) and each result is {horizon: metrics}.
+    """
+    def __init__(self, job_id, model_names, test_data=None, feature_names=None, data_hash=None, data_rows=None, horizon=1,
+                 horizons=None):
+        self.id = job_id
+        self.model_names = list(model_names)
+        self.test_data = test_data
+        self.feature_names = feature_names
+        self.data_hash = data_hash
+        self.data_rows = data_rows
+        self.horizon = horizon
+        self.horizons = horizons
+        self.registered = {}
+        self.status = 'queued'
+        self.results = {}
+        self.errors = {}
+        self.skipped = []
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+    
+    @property
+    def completed(self):
+        """Models that have finished, in completion order"""
+        with self._lock:
+            return list(self.results) + list(self.errors) + list(self.skipped)
+    
+    @property
+    def progress(self):
+        """Fraction of the models that have finished"""
+        return len(self.completed) / len(self.model_names) if self.model_names else 1.0
+    
+    @property
+    def running(self):
+        return self.status in ('queued', 'running')
+    
+    def snapshot(self):
+        """Copy of the results so far, safe to render while the job is still running"""
+        with self._lock:
+            return dict(self.results)
+    
+    def _register(self, trainer, model_name, metrics):
+        """Save a finished model to the registry; a failed save only costs the warm start
+        
+        A version trained on the same features and data is reused rather than
+        saved again. Returns the version, or a "not saved" message.
+        """
+        if self.data_hash is None:
+            return None
+        
+        if self.horizons:
+            model_name = horizon_entry(model_name)
+        
+        try:
+            existing = find_model(model_name, self.feature_names, self.data_hash)
+            if existing is not None:
+                return existing['version']
+            
+            version = register_model(trainer, model_name, self.feature_names, self.data_hash, metrics)
+            
+            # Sessions that warm-load this version share the fitted model instead of reading it back;
+            # the saved files' sizes stand in for their memory, so nothing is serialized just to be measured
+            path = model_path(model_name, version)
+            model, scaler = fitted_objects(trainer, model_name)
+            shared_cache.put(('model', path), model, nbytes=os.path.getsize(path))
+            if scaler is not None:
+                scaler_path = os.path.join(os.path.dirname(path), 'scaler.joblib')
+                shared_cache.put(('scaler', scaler_path), scaler, nbytes=os.path.getsize(scaler_path))
+            
+            return version
+        except Exception as e:
+            return f"not saved: {e}"
+    
+    def _train_horizons(self, trainer, X_train, Y_train, X_val, Y_val, cores):
+        """(model_name, metrics, error) of each multi-horizon model, trained one after another"""
+        trainer.horizon_feature_names = list(self.feature_names or [])
+        for model_name in self.model_names:
+            try:
+                yield model_name, trainer.train_multi_horizon(
+                    model_name, X_train, Y_train, X_val, Y_val, self.horizons, n_jobs=cores
+                ), None
+            except Exception as e:
+                yield model_name, None, str(e)
+    
+    def _run(self, trainer, X_train, y_train, X_val, y_val, df):
+        self.status = 'running'
+        self.started_at = time.time()
+        
+        try:
+            cores = max(1, (os.cpu_count() or 1) // TRAINING_JOB_WORKERS)
+            if self.horizons:
+                finished = self._train_horizons(trainer, X_train, y_train, X_val, y_val, cores)
+            else:
+                finished = trainer.train_models(
+                    self.model_names, X_train, y_train, X_val, y_val, df=df, data_rows=self.data_rows,
+                    horizon=self.horizon, cores=cores
+                )
+            
+            for model_name, metrics, error in finished:
+                # Saved before taking the lock, so polling reruns never wait on a large model write
+                version = self._register(trainer, model_name, metrics) if metrics and not error else None
+                
+                with self._lock:
+                    if error:
+                        self.errors[model_name] = error
+                    elif metrics:
+                        self.results[model_name] = metrics
+                        if version is not None:
+                            self.registered[model_name] = version
+                    else:
+                        self.skipped.append(model_name)
+            self.status = 'done'
+        except Exception as e:
+            with self._lock:
+                self.errors['job'] = str(e)
+            self.status = 'failed'
+        finally:
+            self.finished_at = time.time()
+
+def submit_training_job(trainer, model_names, X_train, y_train, X_val, y_val, df=None, test_data=None,
+                        feature_names=None, data_rows=None, horizon=1, horizons=None):
+    """Start training model_names on trainer in the background and return the job id
+    
+    The job is kept in st.session_state.training_jobs, so it survives reruns and
+    any page can poll it with get_training_job. Trained models are added to
+    trainer as each one finishes, and saved to the model registry when
+    feature_names is given. data_rows (the length of the full feature matrix
+    the splits come from) and horizon let the models be updated incrementally
+    later; see ModelTrainer.update_model. With horizons (and 2-D targets with
+    one column per horizon) multi-horizon models are trained and registered
+    instead.
+    
+    Finished jobs are dropped when the next one is submitted; their results
+    were published to the page when they finished.
+    """
+    st.session_state.training_jobs = {
+        job_id: job for job_id, job in st.session_state.get('training_jobs', {}).items() if job.running
+    }
+    
+    data_hash = training_data_hash(X_train, y_train) if feature_names is not None else None
+    job = TrainingJob(next(_job_ids), model_names, test_data, feature_names, data_hash, data_rows, horizon, horizons)
+    st.session_state.training_jobs[job.id] = job
+    _executor.submit(job._run, trainer, X_train, y_train, X_val, y_val, df)
+    
+    return job.id
+
+def get_training_job(job_id):
+    """The session's job with job_id, or None"""
+    return st.session_state.get('training_jobs', {}).get(job_id)
+
+def active_training_jobs():
+    """The session's queued and running jobs"""
+    return [job for job in st.session_state.get('training_jobs', {}).values() if job.running]